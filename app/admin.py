@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from shared.db.connection import engine, get_session
+from shared.utils.logging import log_exceptions
+
+from .archive import archive_deleted_members
+from .cache import member_list_cache
+from .counters import counter_coalescer
+from .dataloader import member_loader
+from .group_commit import group_committer
+from .notifications import member_events
+from .replica import replica_router
+from .schemas import ArchiveOut
+from .slow_queries import slow_query_log
+
+router = APIRouter(prefix="/admin")
+
+@router.get("/cache")
+async def cache_stats():
+    return member_list_cache.stats()
+
+@router.get("/counters")
+async def counter_stats():
+    return counter_coalescer.stats()
+
+@router.get("/group-commit")
+async def group_commit_stats():
+    return group_committer.stats()
+
+@router.get("/loader")
+async def loader_stats():
+    return member_loader.stats()
+
+@router.get("/events")
+async def event_stats():
+    return member_events.stats()
+
+@router.get("/replica")
+async def replica_stats():
+    return replica_router.stats()
+
+@router.get("/slow-queries")
+async def slow_queries():
+    return slow_query_log.snapshot()
+
+@router.post("/archive", response_model=ArchiveOut)
+@log_exceptions
+async def archive_members(
+    retention_days: float | None = Query(None, ge=0),
+    batch_size: int | None = Query(None, ge=1, le=100_000),
+    session: AsyncSession = Depends(get_session),
+):
+    report = await archive_deleted_members(session.bind or engine, retention_days, batch_size)
+    return ArchiveOut(
+        rows_moved=report.rows_moved,
+        batches=report.batches,
+        cutoff=report.cutoff,
+        elapsed_seconds=report.elapsed,
+    )
@@ -0,0 +1,78 @@
+"""Move soft-deleted members into members_archive to keep the live table small.
+
+    python -m app.archive [--retention-days 30] [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, select
+
+from .config import MEMBER_ARCHIVE_BATCH_SIZE, MEMBER_ARCHIVE_RETENTION_DAYS
+from .models import MemberArchiveDB, MemberDB
+
+ARCHIVED_COLUMNS = tuple(c.name for c in MemberArchiveDB.__table__.columns if c.name != "archived_at")
+
+
+@dataclass
+class ArchiveReport:
+    rows_moved: int = 0
+    batches: int = 0
+    cutoff: datetime | None = None
+    elapsed: float = 0.0
+
+
+def _archive_batch(cutoff: datetime, batch_size: int):
+    # DELETE ... RETURNING feeds INSERT ... SELECT in one statement; SKIP LOCKED
+    # keeps the archiver out of the way of concurrent writers
+    doomed = (
+        select(MemberDB.id)
+        .where(MemberDB.deleted == True, MemberDB.updated_at < cutoff)
+        .order_by(MemberDB.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(MemberDB)
+        .where(MemberDB.id.in_(doomed.scalar_subquery()))
+        .returning(*(MemberDB.__table__.c[name] for name in ARCHIVED_COLUMNS))
+        .cte("moved")
+    )
+    return insert(MemberArchiveDB).from_select(ARCHIVED_COLUMNS, select(moved)).add_cte(moved)
+
+
+async def archive_deleted_members(bind, retention_days: float | None = None, batch_size: int | None = None) -> ArchiveReport:
+    retention_days = MEMBER_ARCHIVE_RETENTION_DAYS if retention_days is None else retention_days
+    batch_size = batch_size or MEMBER_ARCHIVE_BATCH_SIZE
+    report = ArchiveReport(cutoff=datetime.now(timezone.utc) - timedelta(days=retention_days))
+    started = time.perf_counter()
+    while True:
+        async with bind.begin() as conn:
+            result = await conn.execute(_archive_batch(report.cutoff, batch_size))
+        report.batches += 1
+        report.rows_moved += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.archive", description="Archive soft-deleted members")
+    parser.add_argument("--retention-days", type=float, default=MEMBER_ARCHIVE_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=MEMBER_ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from shared.db.connection import engine
+
+    report = asyncio.run(archive_deleted_members(engine, args.retention_days, args.batch_size))
+    print(
+        f"moved {report.rows_moved} members deleted before {report.cutoff.isoformat()} "
+        f"to members_archive in {report.batches} batches, {report.elapsed:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
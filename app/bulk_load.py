@@ -0,0 +1,227 @@
+"""Offline bulk loader for member rows.
+
+Streams a JSONL or CSV file, validates rows with MemberCreate in batches,
+COPYs each batch into a temporary staging table and merges it into
+``members``, one transaction per batch. Rows that are invalid, duplicated
+within the file or already taken by a live member are reported as rejected.
+Batches committed before an error stay loaded.
+
+    python -m app.bulk_load members.jsonl [--format csv] [--batch-size 5000] [--rejects rejects.jsonl]
+"""
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import asyncpg
+from pydantic import ValidationError
+
+from .schemas import MemberCreate
+
+STAGING_TABLE = "members_staging"
+LOADED_TABLE = "members_loaded"
+COLUMNS = ("first_name", "last_name", "login", "avatar_url", "followers", "following", "title", "email")
+DEFAULT_BATCH_SIZE = 5000
+
+CREATE_STAGING = f"""
+CREATE TEMP TABLE {STAGING_TABLE} (
+    lineno bigint NOT NULL,
+    first_name text NOT NULL,
+    last_name text NOT NULL,
+    login text NOT NULL,
+    avatar_url text,
+    followers integer NOT NULL,
+    following integer NOT NULL,
+    title text,
+    email text NOT NULL
+) ON COMMIT DELETE ROWS;
+CREATE TEMP TABLE {LOADED_TABLE} (login text PRIMARY KEY, email text NOT NULL, batch integer NOT NULL);
+CREATE INDEX ON {LOADED_TABLE} (email);
+"""
+
+# First occurrence of a login/email in the file wins: within a batch by rank,
+# across batches because earlier batches are already merged. ON CONFLICT DO
+# NOTHING covers the partial unique indexes ix_members_login_unique / ix_members_email_unique
+RANKED_STAGING = f"""
+SELECT s.*,
+       row_number() OVER (PARTITION BY login ORDER BY lineno) AS login_rank,
+       row_number() OVER (PARTITION BY email ORDER BY lineno) AS email_rank
+FROM {STAGING_TABLE} s
+"""
+
+MERGE = f"""
+WITH inserted AS (
+    INSERT INTO members ({", ".join(COLUMNS)}, deleted)
+    SELECT {", ".join(COLUMNS)}, false
+    FROM ({RANKED_STAGING}) ranked
+    WHERE login_rank = 1 AND email_rank = 1
+    ORDER BY lineno
+    ON CONFLICT DO NOTHING
+    RETURNING login, email
+)
+INSERT INTO {LOADED_TABLE} SELECT login, email, $1 FROM inserted
+"""
+
+MERGE_REJECTS = f"""
+SELECT lineno, login, email,
+       CASE WHEN login_rank > 1 OR email_rank > 1
+              OR EXISTS (SELECT 1 FROM {LOADED_TABLE} l
+                         WHERE l.batch < $1 AND (l.login = ranked.login OR l.email = ranked.email))
+            THEN 'duplicate in file'
+            ELSE 'conflicts with an existing member' END AS reason
+FROM ({RANKED_STAGING}) ranked
+WHERE login_rank > 1 OR email_rank > 1
+   OR NOT EXISTS (SELECT 1 FROM {LOADED_TABLE} l WHERE l.batch = $1 AND l.login = ranked.login)
+ORDER BY lineno
+"""
+
+
+@dataclass
+class LoadReport:
+    read: int = 0
+    staged: int = 0
+    loaded: int = 0
+    rejected: list[dict] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+def _iter_jsonl(f):
+    for lineno, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield lineno, json.loads(line)
+        except ValueError as e:
+            yield lineno, e
+
+
+def _iter_csv(f):
+    reader = csv.DictReader(f)
+    for row in reader:
+        # Empty cells fall back to the schema defaults
+        yield reader.line_num, {k: v for k, v in row.items() if v not in ("", None)}
+
+
+def iter_rows(path: Path, fmt: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from (_iter_csv(f) if fmt == "csv" else _iter_jsonl(f))
+
+
+def _validate(lineno: int, row, report: LoadReport):
+    if isinstance(row, Exception):
+        report.rejected.append({"lineno": lineno, "reason": f"invalid JSON: {row}"})
+        return None
+    try:
+        member = MemberCreate.model_validate(row)
+    except ValidationError as e:
+        reason = "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors())
+        report.rejected.append({"lineno": lineno, "reason": reason})
+        return None
+    return (lineno, *(getattr(member, c) for c in COLUMNS))
+
+
+async def _stage(conn, batch: list[tuple], report: LoadReport) -> None:
+    try:
+        async with conn.transaction():
+            await conn.copy_records_to_table(STAGING_TABLE, records=batch, columns=("lineno", *COLUMNS))
+        report.staged += len(batch)
+        return
+    except (asyncpg.DataError, OverflowError):
+        pass
+    # Something validation let through; find the rows COPY refuses one by one
+    for record in batch:
+        try:
+            async with conn.transaction():
+                await conn.copy_records_to_table(STAGING_TABLE, records=[record], columns=("lineno", *COLUMNS))
+            report.staged += 1
+        except (asyncpg.DataError, OverflowError) as e:
+            report.rejected.append({"lineno": record[0], "reason": f"refused by the database: {e}"})
+
+
+async def _merge(conn, batch: list[tuple], number: int, report: LoadReport) -> None:
+    async with conn.transaction():
+        await _stage(conn, batch, report)
+        await conn.execute(MERGE, number)
+        for r in await conn.fetch(MERGE_REJECTS, number):
+            report.rejected.append(
+                {"lineno": r["lineno"], "login": r["login"], "email": r["email"], "reason": r["reason"]}
+            )
+
+
+def default_dsn() -> str:
+    from shared.db.connection import engine
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def load_file(path, fmt: str | None = None, batch_size: int = DEFAULT_BATCH_SIZE, dsn: str | None = None) -> LoadReport:
+    path = Path(path)
+    fmt = fmt or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+    report = LoadReport()
+    started = time.perf_counter()
+
+    conn = await asyncpg.connect(dsn or default_dsn())
+    try:
+        # Temp tables live as long as the connection; staging is emptied by every commit
+        await conn.execute(CREATE_STAGING)
+
+        # One short transaction per batch, so locks and row versions are not
+        # held for the whole file and the change feed is not held back by it
+        batch, batches = [], 0
+        for lineno, row in iter_rows(path, fmt):
+            report.read += 1
+            record = _validate(lineno, row, report)
+            if record is not None:
+                batch.append(record)
+            if len(batch) >= batch_size:
+                batches += 1
+                await _merge(conn, batch, batches, report)
+                batch = []
+        if batch:
+            batches += 1
+            await _merge(conn, batch, batches, report)
+
+        report.loaded = await conn.fetchval(f"SELECT count(*) FROM {LOADED_TABLE}")
+    finally:
+        await conn.close()
+
+    report.rejected.sort(key=lambda r: r["lineno"])
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bulk_load", description="Bulk load members with COPY")
+    parser.add_argument("path", type=Path, help="JSONL or CSV file with one member per row")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per validation/COPY batch")
+    parser.add_argument("--dsn", help="postgresql:// DSN, defaults to the service database")
+    parser.add_argument("--rejects", type=Path, help="write rejected rows as JSONL here instead of stderr")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(load_file(args.path, args.format, args.batch_size, args.dsn))
+
+    out = open(args.rejects, "w", encoding="utf-8") if args.rejects else sys.stderr
+    try:
+        for rejected in report.rejected:
+            out.write(json.dumps(rejected) + "\n")
+    finally:
+        if args.rejects:
+            out.close()
+
+    print(
+        f"read {report.read} rows, loaded {report.loaded}, rejected {len(report.rejected)} "
+        f"in {report.elapsed:.2f}s ({report.rows_per_second:,.0f} rows/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
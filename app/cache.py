@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from .changes import on_members_changed
+from .config import MEMBER_CACHE_SIZE, MEMBER_CACHE_TTL
+
+
+class ResponseCache:
+    """Bounded LRU + TTL cache of serialized response bodies.
+
+    Writes call invalidate(), which bumps the version and drops every entry.
+    Readers pass the version they saw before querying to set(), so a result
+    computed across a concurrent write is never stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, version: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys=None) -> None:
+        # keys=None drops every entry; either way in-flight results are not stored
+        with self._lock:
+            self.version += 1
+            if keys is None:
+                self._entries.clear()
+            else:
+                for key in keys:
+                    self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+member_list_cache = ResponseCache(MEMBER_CACHE_SIZE, MEMBER_CACHE_TTL)
+
+
+@on_members_changed
+def _invalidate_member_list(ids) -> None:
+    member_list_cache.invalidate()
@@ -0,0 +1,18 @@
+from collections.abc import Callable, Iterable
+
+# Called after every committed write to members with the affected ids,
+# or None when the set of affected members is not known
+MembersChangedListener = Callable[[Iterable[int] | None], None]
+
+_listeners: list[MembersChangedListener] = []
+
+
+def on_members_changed(listener: MembersChangedListener) -> MembersChangedListener:
+    _listeners.append(listener)
+    return listener
+
+
+def members_changed(ids: Iterable[int] | None = None) -> None:
+    ids = list(ids) if ids is not None else None
+    for listener in _listeners:
+        listener(ids)
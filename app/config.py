@@ -0,0 +1,65 @@
+import os
+
+# Cache of serialized GET /members responses; a TTL of 0 disables it
+MEMBER_CACHE_SIZE = int(os.getenv("MEMBER_CACHE_SIZE", "256"))
+MEMBER_CACHE_TTL = float(os.getenv("MEMBER_CACHE_TTL", "5"))
+
+# Opt-in group commit for POST /members: concurrent creates are inserted in one
+# transaction once MAX_ROWS are queued or the oldest has waited MAX_WAIT_MS
+MEMBER_GROUP_COMMIT = os.getenv("MEMBER_GROUP_COMMIT", "0").lower() in ("1", "true", "yes")
+MEMBER_GROUP_COMMIT_MAX_ROWS = int(os.getenv("MEMBER_GROUP_COMMIT_MAX_ROWS", "500"))
+MEMBER_GROUP_COMMIT_MAX_WAIT_MS = float(os.getenv("MEMBER_GROUP_COMMIT_MAX_WAIT_MS", "5"))
+
+# Per-id cache of members served by GET /members/{id} and POST /members/lookup
+MEMBER_LOOKUP_CACHE_SIZE = int(os.getenv("MEMBER_LOOKUP_CACHE_SIZE", "10000"))
+MEMBER_LOOKUP_CACHE_TTL = float(os.getenv("MEMBER_LOOKUP_CACHE_TTL", "5"))
+
+# DELETE /members soft-deletes in id ranges of this width, one short transaction each
+MEMBER_DELETE_BATCH_SIZE = int(os.getenv("MEMBER_DELETE_BATCH_SIZE", "1000"))
+MEMBER_DELETE_BATCH_PAUSE = float(os.getenv("MEMBER_DELETE_BATCH_PAUSE", "0"))
+
+# Soft-deleted members older than this are moved to members_archive
+MEMBER_ARCHIVE_RETENTION_DAYS = float(os.getenv("MEMBER_ARCHIVE_RETENTION_DAYS", "30"))
+MEMBER_ARCHIVE_BATCH_SIZE = int(os.getenv("MEMBER_ARCHIVE_BATCH_SIZE", "1000"))
+
+# Coalesced counter increments are written at most this often
+MEMBER_COUNTER_FLUSH_MS = float(os.getenv("MEMBER_COUNTER_FLUSH_MS", "50"))
+
+# member_rankings is refreshed at most this often after local writes, and at
+# least this often regardless, to pick up writes made by other processes
+MEMBER_LEADERBOARD_REFRESH_SECONDS = float(os.getenv("MEMBER_LEADERBOARD_REFRESH_SECONDS", "5"))
+MEMBER_LEADERBOARD_MAX_STALENESS = float(os.getenv("MEMBER_LEADERBOARD_MAX_STALENESS", "60"))
+
+# pg_trgm word_similarity threshold for typo-tolerant search; lower values
+# admit more typos but also more unrelated members
+MEMBER_SEARCH_SIMILARITY = float(os.getenv("MEMBER_SEARCH_SIMILARITY", "0.6"))
+
+# Optional read replica for GET routes; clients that just wrote are kept on the
+# primary until the replica has replayed their commit
+MEMBER_REPLICA_DATABASE_URL = os.getenv("MEMBER_REPLICA_DATABASE_URL", "")
+MEMBER_REPLICA_LSN_COOKIE_MAX_AGE = int(os.getenv("MEMBER_REPLICA_LSN_COOKIE_MAX_AGE", "300"))
+
+# Startup retries the database with jittered exponential backoff, then opens
+# this many pooled connections and prepares the hot queries on each of them
+MEMBER_DB_CONNECT_ATTEMPTS = int(os.getenv("MEMBER_DB_CONNECT_ATTEMPTS", "10"))
+MEMBER_DB_BACKOFF_BASE = float(os.getenv("MEMBER_DB_BACKOFF_BASE", "0.1"))
+MEMBER_DB_BACKOFF_MAX = float(os.getenv("MEMBER_DB_BACKOFF_MAX", "5"))
+MEMBER_POOL_PREWARM = int(os.getenv("MEMBER_POOL_PREWARM", "5"))
+
+# GET /members/changes holds back rows updated in the last MEMBER_CHANGES_LAG_SECONDS:
+# updated_at is the writer's transaction start, so a slow transaction can commit
+# a row older than one a consumer has already been given. Any transaction still
+# open in the database holds the feed back further, to its start, so long-running
+# ones delay it; the service role must see its sessions in pg_stat_activity
+MEMBER_CHANGES_LAG_SECONDS = float(os.getenv("MEMBER_CHANGES_LAG_SECONDS", "1"))
+
+# GET /members/events: buffered events per subscriber before it is dropped as too
+# slow, and the interval of keep-alive comments on idle streams
+MEMBER_EVENTS_QUEUE_SIZE = int(os.getenv("MEMBER_EVENTS_QUEUE_SIZE", "100"))
+MEMBER_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("MEMBER_EVENTS_HEARTBEAT_SECONDS", "15"))
+
+# Statements slower than this are kept in the slow query log (0 disables it);
+# a fraction of the slow SELECTs is re-run with EXPLAIN (ANALYZE, BUFFERS)
+MEMBER_SLOW_QUERY_MS = float(os.getenv("MEMBER_SLOW_QUERY_MS", "0"))
+MEMBER_SLOW_QUERY_LOG_SIZE = int(os.getenv("MEMBER_SLOW_QUERY_LOG_SIZE", "100"))
+MEMBER_SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("MEMBER_SLOW_QUERY_EXPLAIN_SAMPLE", "0"))
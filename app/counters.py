@@ -0,0 +1,157 @@
+import asyncio
+import logging
+
+from sqlalchemy import BigInteger, Integer, column, func, update, values
+from sqlalchemy.exc import DBAPIError
+
+from .changes import members_changed
+from .config import MEMBER_COUNTER_FLUSH_MS
+from .crud import data_error_detail, is_data_error
+from .models import MemberDB
+from .notifications import notify_members
+
+
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+
+def _clamp(value: int) -> int:
+    return max(INT32_MIN, min(value, INT32_MAX))
+
+
+def _saturating_add(counter, delta):
+    # Summed as bigint so the addition itself cannot overflow, then held to [0, int4 max]
+    return func.least(func.greatest(func.coalesce(counter, 0).cast(BigInteger) + delta, 0), INT32_MAX)
+
+
+def counter_values(followers, following) -> dict:
+    # Relative, atomic in SQL, never below zero and never past what the column holds
+    return {
+        "followers": _saturating_add(MemberDB.followers, followers),
+        "following": _saturating_add(MemberDB.following, following),
+        "updated_at": func.now(),
+    }
+
+
+class CounterCoalescer:
+    """Merges counter increments per member over a short window.
+
+    All increments buffered during the window are written by a single
+    UPDATE ... FROM (VALUES ...) statement. A failed flush puts its
+    increments back and is retried a window later; buffered increments are
+    lost only if the process dies, or shuts down with the database
+    unreachable, before a flush succeeds. A flush the database refuses for
+    its values is retried member by member and only the refused deltas are
+    dropped, since retrying them could never succeed.
+    """
+
+    def __init__(self, window_ms: float):
+        self.window = window_ms / 1000
+        self.increments = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self._pending: dict[int, list[int]] = {}
+        self._bind = None
+        self._task: asyncio.Task | None = None
+
+    def add(self, bind, member_id: int, followers: int, following: int) -> None:
+        # Sums are held to int4 like the deltas; the UPDATE saturates anyway
+        delta = self._pending.setdefault(member_id, [0, 0])
+        delta[0] = _clamp(delta[0] + followers)
+        delta[1] = _clamp(delta[1] + following)
+        self.increments += 1
+        self._bind = bind
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_later())
+
+    def _restore(self, pending: dict[int, list[int]]) -> None:
+        for member_id, (followers, following) in pending.items():
+            delta = self._pending.setdefault(member_id, [0, 0])
+            delta[0] = _clamp(delta[0] + followers)
+            delta[1] = _clamp(delta[1] + following)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logging.exception("Failed to flush coalesced member counters, retrying")
+            self._schedule()
+
+    async def _write(self, pending: dict[int, list[int]]) -> int:
+        deltas = values(
+            column("id", Integer), column("followers", Integer), column("following", Integer), name="deltas"
+        ).data([(member_id, d[0], d[1]) for member_id, d in pending.items()])
+        stmt = (
+            update(MemberDB)
+            .where(MemberDB.id == deltas.c.id, MemberDB.deleted == False)
+            .values(counter_values(deltas.c.followers, deltas.c.following))
+        )
+        async with self._bind.begin() as conn:
+            result = await conn.execute(stmt)
+            await notify_members(conn, "updated", pending)
+        return result.rowcount
+
+    async def _write_each(self, pending: dict[int, list[int]]) -> tuple[int, dict[int, list[int]]]:
+        # Isolates the members whose deltas the database refuses
+        rows, written = 0, {}
+        items = list(pending.items())
+        for i, (member_id, delta) in enumerate(items):
+            try:
+                rows += await self._write({member_id: delta})
+            except Exception as e:
+                if not (isinstance(e, DBAPIError) and is_data_error(e)):
+                    self.failed_flushes += 1
+                    self._restore(dict(items[i:]))
+                    raise
+                self.dropped += 1
+                logging.error("Dropped counter delta %s for member %s: %s", delta, member_id, data_error_detail(e))
+                continue
+            written[member_id] = delta
+        return rows, written
+
+    async def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            rows, written = await self._write(pending), pending
+        except Exception as e:
+            if not (isinstance(e, DBAPIError) and is_data_error(e)):
+                # Already acknowledged with 202, so kept for the next flush
+                self.failed_flushes += 1
+                self._restore(pending)
+                raise
+            rows, written = await self._write_each(pending)
+        self.flushes += 1
+        self.rows_written += rows
+        members_changed(written)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            # Shutdown goes on; the other components still need closing
+            logging.exception("Lost coalesced counter increments for %d member(s)", len(self._pending))
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000,
+            "pending_members": len(self._pending),
+            "increments": self.increments,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+            "rows_written": self.rows_written,
+        }
+
+
+counter_coalescer = CounterCoalescer(MEMBER_COUNTER_FLUSH_MS)
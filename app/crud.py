@@ -0,0 +1,101 @@
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import MemberDB
+from .schemas import MemberCreate, MemberUpsert
+
+# 8 bound parameters per row keeps a chunk well below the asyncpg limit of 32767
+INSERT_CHUNK_SIZE = 500
+
+
+async def _insert_chunk(session: AsyncSession, chunk: list[MemberCreate]) -> dict[str, MemberDB]:
+    result = await session.scalars(
+        insert(MemberDB)
+        .values([p.model_dump() for p in chunk])
+        .on_conflict_do_nothing()
+        .returning(MemberDB)
+    )
+    return {m.login: m for m in result.all()}
+
+
+async def insert_members(
+    session: AsyncSession, payloads: list[MemberCreate], rejected: dict[str, str] | None = None
+) -> dict[str, MemberDB]:
+    """Insert members with multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+    Rows hitting one of the partial unique indexes are skipped instead of
+    aborting the transaction. Returns the created members keyed by login.
+
+    With `rejected`, a chunk whose values Postgres refuses is retried row by
+    row in savepoints, and the refused rows are recorded there by login
+    instead of failing the whole chunk.
+    """
+    created = {}
+    for start in range(0, len(payloads), INSERT_CHUNK_SIZE):
+        chunk = payloads[start:start + INSERT_CHUNK_SIZE]
+        if rejected is None:
+            created.update(await _insert_chunk(session, chunk))
+            continue
+        try:
+            async with session.begin_nested():
+                created.update(await _insert_chunk(session, chunk))
+        except DBAPIError as e:
+            if not is_data_error(e):
+                raise
+            for payload in chunk:
+                try:
+                    async with session.begin_nested():
+                        created.update(await _insert_chunk(session, [payload]))
+                except DBAPIError as e:
+                    if not is_data_error(e):
+                        raise
+                    rejected[payload.login] = data_error_detail(e)
+    return created
+
+
+async def find_conflicts(session: AsyncSession, logins, emails) -> tuple[set[str], set[str]]:
+    """Return the subset of logins and emails already taken by live members."""
+    logins, emails = set(logins), set(emails)
+    if not logins and not emails:
+        return set(), set()
+    result = await session.execute(
+        select(MemberDB.login, MemberDB.email).where(
+            MemberDB.deleted == False,
+            or_(MemberDB.login.in_(logins), MemberDB.email.in_(emails)),
+        )
+    )
+    taken_logins, taken_emails = set(), set()
+    for login, email in result.all():
+        taken_logins.add(login)
+        taken_emails.add(email)
+    return taken_logins & logins, taken_emails & emails
+
+
+async def upsert_member(session: AsyncSession, login: str, payload: MemberUpsert) -> MemberDB:
+    """Create the live member with this login or update it in place, in one statement."""
+    values = payload.model_dump()
+    stmt = insert(MemberDB).values(login=login, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MemberDB.login],
+        index_where=MemberDB.deleted == False,
+        set_={**{name: stmt.excluded[name] for name in values}, "updated_at": func.now()},
+    )
+    return await session.scalar(
+        stmt.returning(MemberDB), execution_options={"populate_existing": True}
+    )
+
+
+def is_data_error(error: DBAPIError) -> bool:
+    # SQLSTATE class 22, data exception: the values are at fault, not the
+    # statement. asyncpg raises its DataError for unencodable parameters too.
+    return str(getattr(getattr(error.orig, "__cause__", None), "sqlstate", "")).startswith("22")
+
+
+def data_error_detail(error: DBAPIError) -> str:
+    return str(getattr(error.orig, "__cause__", None) or error.orig)
+
+
+def violated_index(error: IntegrityError) -> str | None:
+    # asyncpg's UniqueViolationError, chained by the SQLAlchemy adapter, names the index
+    return getattr(getattr(error.orig, "__cause__", None), "constraint_name", None)
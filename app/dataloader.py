@@ -0,0 +1,98 @@
+import asyncio
+
+from sqlalchemy import any_, select
+
+from .cache import ResponseCache
+from .changes import on_members_changed
+from .config import MEMBER_LOOKUP_CACHE_SIZE, MEMBER_LOOKUP_CACHE_TTL
+from .models import MemberDB
+from .serialization import MEMBER_OUT_COLUMNS
+
+
+def member_lookup_query(ids):
+    return select(*MEMBER_OUT_COLUMNS).where(MemberDB.id == any_(list(ids)), MemberDB.deleted == False)
+
+
+class MemberLoader:
+    """Batches concurrent lookups of live members by id.
+
+    Ids requested during the same event-loop tick are fetched by a single
+    WHERE id = ANY(:ids) query. Found members are kept in a per-id TTL cache
+    that is invalidated for every id passed to members_changed().
+    """
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+        self.loads = 0
+        self.batches = 0
+        self.ids_fetched = 0
+        self._pending: dict[int, list[asyncio.Future]] = {}
+        self._bind = None
+        self._task: asyncio.Task | None = None
+
+    async def load(self, bind, member_id: int) -> dict | None:
+        return (await self.load_many(bind, [member_id]))[member_id]
+
+    async def load_many(self, bind, member_ids) -> dict[int, dict | None]:
+        found, futures = {}, {}
+        for member_id in dict.fromkeys(member_ids):
+            self.loads += 1
+            member = self.cache.get(member_id)
+            if member is not None:
+                found[member_id] = member
+                continue
+            future = asyncio.get_running_loop().create_future()
+            self._pending.setdefault(member_id, []).append(future)
+            futures[member_id] = future
+        if futures:
+            self._bind = bind
+            if self._task is None:
+                self._task = asyncio.create_task(self._dispatch())
+            for member_id, future in futures.items():
+                found[member_id] = await future
+        return found
+
+    async def _dispatch(self) -> None:
+        # Runs on the next loop iteration, after every caller of this tick queued its ids
+        pending, self._pending = self._pending, {}
+        self._task = None
+        version = self.cache.version
+        try:
+            async with self._bind.connect() as conn:
+                result = await conn.execute(member_lookup_query(pending))
+                members = {row.id: row._asdict() for row in result}
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        self.batches += 1
+        self.ids_fetched += len(pending)
+        for member_id, futures in pending.items():
+            member = members.get(member_id)
+            if member is not None:
+                self.cache.set(member_id, member, version)
+            for future in futures:
+                if not future.done():
+                    future.set_result(member)
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self.loads = self.batches = self.ids_fetched = 0
+
+    def stats(self) -> dict:
+        return {
+            "loads": self.loads,
+            "batches": self.batches,
+            "ids_fetched": self.ids_fetched,
+            "cache": self.cache.stats(),
+        }
+
+
+member_loader = MemberLoader(ResponseCache(MEMBER_LOOKUP_CACHE_SIZE, MEMBER_LOOKUP_CACHE_TTL))
+
+
+@on_members_changed
+def _invalidate_loaded_members(ids) -> None:
+    member_loader.cache.invalidate(ids)
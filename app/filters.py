@@ -0,0 +1,53 @@
+from dataclasses import astuple, dataclass
+from datetime import datetime
+
+from fastapi import Query
+from sqlalchemy import desc, select
+
+from .models import MemberDB
+from .serialization import MEMBER_OUT_COLUMNS
+
+
+@dataclass(frozen=True)
+class MemberFilters:
+    title: str | None = None
+    min_followers: int | None = None
+    max_followers: int | None = None
+    min_following: int | None = None
+    created_after: datetime | None = None
+
+    def clauses(self) -> list:
+        clauses = []
+        if self.title is not None:
+            clauses.append(MemberDB.title == self.title)
+        if self.min_followers is not None:
+            clauses.append(MemberDB.followers >= self.min_followers)
+        if self.max_followers is not None:
+            clauses.append(MemberDB.followers <= self.max_followers)
+        if self.min_following is not None:
+            clauses.append(MemberDB.following >= self.min_following)
+        if self.created_after is not None:
+            clauses.append(MemberDB.created_at > self.created_after)
+        return clauses
+
+    def key(self) -> tuple:
+        return astuple(self)
+
+
+def member_filters(
+    title: str | None = None,
+    min_followers: int | None = Query(None, ge=0),
+    max_followers: int | None = Query(None, ge=0),
+    min_following: int | None = Query(None, ge=0),
+    created_after: datetime | None = None,
+) -> MemberFilters:
+    return MemberFilters(title, min_followers, max_followers, min_following, created_after)
+
+
+def member_list_query(filters: MemberFilters, columns=MEMBER_OUT_COLUMNS):
+    # Filters are pushed into the WHERE clause; each has a partial index on members
+    return (
+        select(*columns)
+        .where(MemberDB.deleted == False, *filters.clauses())
+        .order_by(desc(MemberDB.followers), desc(MemberDB.id))
+    )
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import MEMBER_GROUP_COMMIT, MEMBER_GROUP_COMMIT_MAX_ROWS, MEMBER_GROUP_COMMIT_MAX_WAIT_MS
+from .crud import find_conflicts, insert_members
+from .notifications import notify_members
+from .schemas import MemberCreate, MemberOut
+
+
+class CreateRejected(Exception):
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class GroupCommitter:
+    """Inserts concurrently submitted members in shared transactions.
+
+    Each flush is one multi-row INSERT ... ON CONFLICT DO NOTHING and one
+    commit for up to max_rows creates. Every caller gets back its own member,
+    or CreateRejected with the detail POST /members has always answered with.
+    A login or email repeated within a batch is rejected for every submission
+    after the first, as if they had been committed one at a time, and a row
+    whose values Postgres refuses fails only its own request.
+    """
+
+    def __init__(self, enabled: bool, max_rows: int, max_wait_ms: float):
+        self.enabled = enabled
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000
+        self.submitted = 0
+        self.flushes = 0
+        self.rows_created = 0
+        self._pending: list[tuple[MemberCreate, asyncio.Future]] = []
+        self._bind = None
+        self._timer: asyncio.Task | None = None
+        self._flushing: set[asyncio.Task] = set()
+
+    async def create(self, bind, payload: MemberCreate) -> MemberOut:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((payload, future))
+        self._bind = bind
+        self.submitted += 1
+        if len(self._pending) >= self.max_rows:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.max_wait)
+        self._timer = None
+        self._start_flush()
+
+    def _start_flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._flush(self._bind, batch))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self, bind, batch) -> None:
+        outcomes: list[MemberOut | CreateRejected] = [None] * len(batch)
+        pending, seen_logins, seen_emails = [], set(), set()
+        for index, (payload, _) in enumerate(batch):
+            if payload.login in seen_logins:
+                outcomes[index] = CreateRejected("Login already exists")
+            elif payload.email in seen_emails:
+                outcomes[index] = CreateRejected("Email already exists")
+            else:
+                seen_logins.add(payload.login)
+                seen_emails.add(payload.email)
+                pending.append((index, payload))
+
+        try:
+            async with AsyncSession(bind, expire_on_commit=False) as session:
+                try:
+                    # Rows Postgres refuses for their values fail on their own
+                    rejected = {}
+                    created = await insert_members(session, [p for _, p in pending], rejected)
+                    skipped = [p for _, p in pending if p.login not in created and p.login not in rejected]
+                    taken_logins, taken_emails = await find_conflicts(
+                        session, [p.login for p in skipped], [p.email for p in skipped]
+                    )
+                    for index, payload in pending:
+                        if payload.login in created:
+                            outcomes[index] = MemberOut.model_validate(created[payload.login])
+                        elif payload.login in rejected:
+                            logging.error(f"Failed to create member {payload.login!r}: {rejected[payload.login]}")
+                            outcomes[index] = CreateRejected("Database error")
+                        elif payload.login in taken_logins:
+                            outcomes[index] = CreateRejected("Login already exists")
+                        elif payload.email in taken_emails:
+                            outcomes[index] = CreateRejected("Email already exists")
+                        else:
+                            # The conflicting member was deleted in the meantime
+                            outcomes[index] = CreateRejected("Database error")
+                    if created:
+                        await notify_members(session, "created", [m.id for m in created.values()])
+                    await session.commit()
+                except BaseException:
+                    await session.rollback()
+                    raise
+        except SQLAlchemyError as e:
+            logging.error(f"Failed to create members in group commit: {e}")
+            outcomes = [o if isinstance(o, CreateRejected) else CreateRejected("Database error") for o in outcomes]
+        except Exception as e:
+            # Surfaces in each waiting request like an error in the route itself
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.flushes += 1
+        self.rows_created += sum(isinstance(o, MemberOut) for o in outcomes)
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, CreateRejected):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    async def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._start_flush()
+        await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_rows": self.max_rows,
+            "max_wait_ms": self.max_wait * 1000,
+            "submitted": self.submitted,
+            "flushes": self.flushes,
+            "rows_created": self.rows_created,
+            "pending": len(self._pending),
+        }
+
+
+group_committer = GroupCommitter(MEMBER_GROUP_COMMIT, MEMBER_GROUP_COMMIT_MAX_ROWS, MEMBER_GROUP_COMMIT_MAX_WAIT_MS)
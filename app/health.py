@@ -0,0 +1,51 @@
+import asyncio
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from shared.db.connection import engine, get_session
+
+from .startup import startup_state
+
+router = APIRouter(prefix="/health")
+
+READY_TIMEOUT = 2
+
+
+def pool_stats(pool) -> dict:
+    # NullPool and friends do not track checkouts
+    stats = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return stats
+
+
+@router.get("/live")
+async def live():
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def ready(session: AsyncSession = Depends(get_session)):
+    body = {
+        "status": "ready",
+        "startup": {
+            "connect_attempts": startup_state.connect_attempts,
+            "schema_created": startup_state.schema_created,
+            "prewarmed": startup_state.prewarmed,
+            "startup_seconds": startup_state.startup_seconds,
+        },
+        "pool": pool_stats((session.bind or engine).pool),
+    }
+    if not startup_state.ready:
+        body["status"] = "starting"
+        return JSONResponse(status_code=503, content=body)
+    try:
+        await asyncio.wait_for(session.execute(select(1)), READY_TIMEOUT)
+    except Exception as e:
+        body["status"] = "unavailable"
+        body["error"] = type(e).__name__
+        return JSONResponse(status_code=503, content=body)
+    return body
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from sqlalchemy import func, update
+
+from .changes import members_changed
+from .notifications import notify_members
+from .config import MEMBER_DELETE_BATCH_PAUSE, MEMBER_DELETE_BATCH_SIZE
+from .models import MemberDB
+
+MAX_FINISHED_JOBS = 100
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class Job:
+    kind: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "pending"
+    first_id: int | None = None
+    last_id: int | None = None
+    current_id: int | None = None
+    batches_done: int = 0
+    rows_updated: int = 0
+    error: str | None = None
+    # How many requests this job serves; later ones may extend last_id
+    requests: int = 1
+    created_at: datetime = field(default_factory=_now)
+    finished_at: datetime | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def extend(self, first_id: int | None, last_id: int | None) -> None:
+        # The job re-reads last_id before every batch, so ids added here are
+        # covered by the same run. A job with no first_id has not started yet:
+        # one that had would already be done
+        self.requests += 1
+        if last_id is None or (self.last_id is not None and last_id <= self.last_id):
+            return
+        if self.first_id is None:
+            self.first_id = first_id
+        self.last_id = last_id
+
+
+class JobRegistry:
+    """In-process registry of background jobs; finished jobs are kept for a while for polling."""
+
+    def __init__(self):
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def running(self, kind: str) -> Job | None:
+        return next((job for job in self._jobs.values() if job.kind == kind and not job.done), None)
+
+    def start(self, job: Job, run) -> Job:
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, run))
+        finished = [job_id for job_id, j in self._jobs.items() if j.done]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+        return job
+
+    async def _run(self, job: Job, run) -> None:
+        job.status = "running"
+        try:
+            await run(job)
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            logging.exception(f"Job {job.id} ({job.kind}) failed")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = _now()
+
+    async def shutdown(self) -> None:
+        tasks = [job.task for job in self._jobs.values() if job.task and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+job_registry = JobRegistry()
+
+
+def soft_delete_all_job(bind, batch_size: int | None = None, pause: float | None = None):
+    # Walk [first_id, last_id] in fixed id ranges, committing after each range so
+    # row locks are held briefly and concurrent writes are not blocked for long
+    batch_size = batch_size or MEMBER_DELETE_BATCH_SIZE
+    pause = MEMBER_DELETE_BATCH_PAUSE if pause is None else pause
+
+    async def run(job: Job) -> None:
+        lo = job.first_id
+        while lo is not None and lo <= job.last_id:
+            hi = min(lo + batch_size, job.last_id + 1)
+            async with bind.begin() as conn:
+                result = await conn.execute(
+                    update(MemberDB)
+                    .values(deleted=True, updated_at=func.now())
+                    .where(MemberDB.id >= lo, MemberDB.id < hi, MemberDB.deleted == False)
+                )
+                if result.rowcount:
+                    await notify_members(conn, "deleted")
+            job.rows_updated += result.rowcount
+            job.batches_done += 1
+            job.current_id = hi - 1
+            if result.rowcount:
+                members_changed()
+            lo = hi
+            await asyncio.sleep(pause)
+    return run
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DDL, Integer, column, event, table, text
+from shared.db.base import Base
+
+from .changes import on_members_changed
+from .config import MEMBER_LEADERBOARD_MAX_STALENESS, MEMBER_LEADERBOARD_REFRESH_SECONDS
+
+# Precomputed ranking of live members in GET /members order. The unique
+# indexes make rank and member lookups O(log n) and allow CONCURRENTLY refreshes.
+member_rankings = table(
+    "member_rankings",
+    column("id", Integer),
+    column("followers", Integer),
+    column("rank", BigInteger),
+)
+
+# Attached to the metadata rather than the members table so existing
+# deployments get the view on the next create_all as well
+for statement in (
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS member_rankings AS
+    SELECT id, followers, row_number() OVER (ORDER BY followers DESC, id DESC) AS rank
+    FROM members
+    WHERE deleted = false
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_member_rankings_id ON member_rankings (id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_member_rankings_rank ON member_rankings (rank)",
+):
+    event.listen(Base.metadata, "after_create", DDL(statement))
+event.listen(Base.metadata, "before_drop", DDL("DROP MATERIALIZED VIEW IF EXISTS member_rankings"))
+
+
+class Leaderboard:
+    def __init__(self, min_interval: float, max_staleness: float):
+        self.min_interval = min_interval
+        self.max_staleness = max_staleness
+        self.dirty = True
+        self.refreshes = 0
+        self.refreshed_at: datetime | None = None
+        self._refreshed_monotonic = float("-inf")
+        self._task: asyncio.Task | None = None
+
+    def mark_dirty(self) -> None:
+        self.dirty = True
+
+    async def refresh(self, bind) -> None:
+        self.dirty = False
+        started = time.monotonic()
+        async with bind.begin() as conn:
+            await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY member_rankings"))
+        self.refreshes += 1
+        self._refreshed_monotonic = started
+        self.refreshed_at = datetime.now(timezone.utc)
+
+    async def _run(self, bind) -> None:
+        while True:
+            await asyncio.sleep(self.min_interval)
+            stale = time.monotonic() - self._refreshed_monotonic >= self.max_staleness
+            if self.dirty or stale:
+                try:
+                    await self.refresh(bind)
+                except Exception:
+                    self.dirty = True
+                    logging.exception("Failed to refresh member_rankings")
+
+    def start(self, bind) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(bind))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+leaderboard = Leaderboard(MEMBER_LEADERBOARD_REFRESH_SECONDS, MEMBER_LEADERBOARD_MAX_STALENESS)
+
+
+@on_members_changed
+def _mark_leaderboard_dirty(ids) -> None:
+    leaderboard.mark_dirty()
@@ -1,32 +1,62 @@
 from fastapi import FastAPI
 from shared.db.connection import engine
 from shared.db.base import Base
-from sqlalchemy.exc import OperationalError
-import asyncio
 from contextlib import asynccontextmanager
 
+from .admin import router as admin_router
+from .config import MEMBER_POOL_PREWARM, MEMBER_SLOW_QUERY_MS
+from .counters import counter_coalescer
+from .dataloader import member_lookup_query
+from .filters import MemberFilters, member_list_query
+from .group_commit import group_committer
+from .health import router as health_router
+from .jobs import job_registry
+from .leaderboard import leaderboard
+from .metrics import MetricsMiddleware, instrument_engine, router as metrics_router
+from .notifications import member_events
+from .pagination import DEFAULT_PAGE_SIZE
+from .replica import ReadYourWritesMiddleware, replica_router
 from .routes import router as member_router
+from .slow_queries import RequestContextMiddleware, slow_query_log
+from .startup import start_database, startup_state
+
+# Run on every pre-warmed connection so their prepared statements already exist
+HOT_QUERIES = (
+    member_list_query(MemberFilters()).limit(DEFAULT_PAGE_SIZE + 1),
+    member_lookup_query([0]),
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    retries = 10
-    for attempt in range(retries):
-        try:
-            async with engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
-            print("Database connected and initialized.")
-            break
-        except OperationalError:
-            print(f" DB not ready (attempt {attempt + 1}/10), retrying...")
-            await asyncio.sleep(2)
-    else:
-        raise RuntimeError("Database failed to connect after multiple retries.")
+    # Startup: the app is reported ready once the pool is warm
+    await start_database(engine, Base.metadata, MEMBER_POOL_PREWARM, HOT_QUERIES)
+    print(
+        f"Database ready after {startup_state.connect_attempts} attempt(s), "
+        f"{startup_state.prewarmed} connection(s) pre-warmed in {startup_state.startup_seconds:.2f}s."
+    )
+
+    leaderboard.start(engine)
 
     yield
 
     # Shutdown
-    # Add any cleanup code here if needed
+    await leaderboard.stop()
+    await job_registry.shutdown()
+    await group_committer.close()
+    await counter_coalescer.close()
+    await member_events.close()
+    await replica_router.close()
+    startup_state.ready = False
+
+instrument_engine(engine)
+if MEMBER_SLOW_QUERY_MS > 0:
+    slow_query_log.install(engine)
 
 app = FastAPI(title="Member Service", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 app.include_router(member_router)
+app.include_router(admin_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
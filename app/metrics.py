@@ -0,0 +1,225 @@
+"""Prometheus metrics, collected in process and rendered on GET /metrics.
+
+Hand-rolled instead of prometheus_client: observing is a bisect and two
+increments, which keeps the per-request overhead to a few microseconds
+(see benchmarks/bench_metrics.py). Metrics are per process.
+"""
+import time
+from bisect import bisect_left
+
+from fastapi import APIRouter, Response
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, labels=(), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets, labelnames=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, labels=()) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Read from a callback at scrape time."""
+
+    def __init__(self, name: str, help: str, read):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def render(self) -> list[str]:
+        value = self.read()
+        if value is None:
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+    def reset(self) -> None:
+        for metric in self.metrics:
+            if isinstance(metric, Counter):
+                metric.values.clear()
+            elif isinstance(metric, Histogram):
+                metric.series.clear()
+
+
+registry = Registry()
+
+http_requests = registry.add(Counter(
+    "http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status")
+))
+http_request_duration = registry.add(Histogram(
+    "http_request_duration_seconds", "Time to produce the full response", LATENCY_BUCKETS, ("route",)
+))
+http_response_size = registry.add(Histogram(
+    "http_response_size_bytes", "Response body size", SIZE_BUCKETS, ("route",)
+))
+db_query_duration = registry.add(Histogram(
+    "db_query_duration_seconds", "Statement execution time by statement type", LATENCY_BUCKETS, ("statement",)
+))
+db_pool_wait = registry.add(Histogram(
+    "db_pool_wait_seconds", "Time to obtain a pooled connection, including opening a new one", LATENCY_BUCKETS
+))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording count, latency and response size per route.
+
+    The route label is the endpoint name FastAPI stores in scope["route"]
+    while routing, e.g. create_member; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            name = route.name if route is not None else "unmatched"
+            http_request_duration.observe(time.perf_counter() - started, (name,))
+            http_response_size.observe(size, (name,))
+            http_requests.inc((name, scope["method"], status))
+
+
+def instrument_engine(engine, pool_gauges: bool = True) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_query_duration.observe(time.perf_counter() - started, (kind,))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(context):
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    _instrument_pool(sync_engine)
+    if not pool_gauges:
+        return
+
+    def pool_stat(name):
+        def read():
+            pool = _instrument_pool(sync_engine)
+            return getattr(pool, name)() if hasattr(pool, name) else None
+        return read
+
+    registry.add(Gauge("db_pool_size", "Configured pool size", pool_stat("size")))
+    registry.add(Gauge("db_pool_checked_out", "Connections currently checked out", pool_stat("checkedout")))
+    registry.add(Gauge("db_pool_checked_in", "Idle connections in the pool", pool_stat("checkedin")))
+    registry.add(Gauge("db_pool_overflow", "Connections opened beyond the pool size", pool_stat("overflow")))
+
+
+def _instrument_pool(sync_engine):
+    # The pool has no "checkout started" event, so its connect() is timed
+    # directly; engine.dispose() replaces the pool, hence the re-check
+    pool = sync_engine.pool
+    if not getattr(pool, "_metrics_instrumented", False):
+        connect = pool.connect
+
+        def timed_connect():
+            started = time.perf_counter()
+            connection = connect()
+            waited = time.perf_counter() - started
+            db_pool_wait.observe(waited)
+            # Kept for the slow query log, which reports it per statement
+            connection.info["pool_wait_seconds"] = waited
+            return connection
+
+        pool.connect = timed_connect
+        pool._metrics_instrumented = True
+    return pool
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Boolean, DateTime, func, Index
+from sqlalchemy import DDL, Integer, String, Boolean, DateTime, event, func, Index, literal_column
 from sqlalchemy.orm import mapped_column
 from shared.db.base import Base
 
@@ -22,4 +22,59 @@ class MemberDB(Base):
     __table_args__ = (
         Index('ix_members_login_unique', 'login', unique=True, postgresql_where=deleted == False),
         Index('ix_members_email_unique', 'email', unique=True, postgresql_where=deleted == False),
+        # Keyset pagination of GET /members walks this index in (followers DESC, id DESC) order
+        Index('ix_members_followers_id_live', followers.desc(), id.desc(), postgresql_where=deleted == False),
+        # Server-side filters of GET /members
+        Index('ix_members_title_followers_live', 'title', followers.desc(), id.desc(), postgresql_where=deleted == False),
+        Index('ix_members_following_live', 'following', postgresql_where=deleted == False),
+        Index('ix_members_created_at_live', 'created_at', postgresql_where=deleted == False),
+        # Every write bumps updated_at; GET /members/changes walks this index in order
+        Index('ix_members_updated_at_id', 'updated_at', 'id'),
     )
+
+def search_document(member=MemberDB):
+    # Must stay an immutable expression with the separator inlined, so the
+    # trigram index below matches the expression used by GET /members/search.
+    # Only the local part of the email is included: shared domains would
+    # otherwise make most members look alike.
+    sep = literal_column("' '")
+    local_part = func.split_part(member.email, literal_column("'@'"), 1)
+    return func.lower(member.login + sep + member.first_name + sep + member.last_name + sep + local_part)
+
+# Search indexes, restricted to live members: btree text_pattern_ops for
+# prefix matches on each column, trigram GiST for typo-tolerant matches read
+# nearest first. The default 12-byte GiST signature saturates on documents
+# this long, which makes nearest-first scans visit most of the index.
+for _column in ("login", "first_name", "last_name", "email"):
+    Index(
+        f"ix_members_{_column}_prefix",
+        func.lower(getattr(MemberDB, _column)).label(f"{_column}_lower"),
+        postgresql_ops={f"{_column}_lower": "text_pattern_ops"},
+        postgresql_where=MemberDB.deleted == False,
+    )
+del _column
+Index(
+    "ix_members_search_gist",
+    search_document().label("search_document"),
+    postgresql_using="gist",
+    postgresql_ops={"search_document": "gist_trgm_ops(siglen=1024)"},
+    postgresql_where=MemberDB.deleted == False,
+)
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+class MemberArchiveDB(Base):
+    """Soft-deleted members moved out of the live table by app.archive."""
+    __tablename__ = "members_archive"
+
+    id = mapped_column(Integer, primary_key=True, autoincrement=False)
+    first_name = mapped_column(String, nullable=False)
+    last_name = mapped_column(String, nullable=False)
+    login = mapped_column(String, nullable=False)
+    avatar_url = mapped_column(String, nullable=True)
+    followers = mapped_column(Integer)
+    following = mapped_column(Integer)
+    title = mapped_column(String, nullable=True)
+    email = mapped_column(String, nullable=False)
+    created_at = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+
+import asyncpg
+import orjson
+from sqlalchemy import func, select
+
+from .config import MEMBER_EVENTS_HEARTBEAT_SECONDS, MEMBER_EVENTS_QUEUE_SIZE
+
+CHANNEL = "member_changes"
+# NOTIFY payloads are capped at 8000 bytes; larger id lists are sent as null
+MAX_PAYLOAD_BYTES = 7900
+DROPPED = object()
+
+
+async def notify_members(conn, event: str, ids=None) -> None:
+    # Sent with the caller's transaction, so listeners only hear about committed writes
+    payload = orjson.dumps({"event": event, "ids": list(ids) if ids is not None else None})
+    if len(payload) > MAX_PAYLOAD_BYTES:
+        payload = orjson.dumps({"event": event, "ids": None})
+    await conn.execute(select(func.pg_notify(CHANNEL, payload.decode())))
+
+
+class Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def push(self, payload) -> bool:
+        try:
+            self.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def drop(self) -> None:
+        # Make room for the marker so a blocked reader wakes up and ends its stream
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(DROPPED)
+
+
+class MemberEventHub:
+    """Fans member change notifications out to in-process subscribers.
+
+    One dedicated asyncpg connection per process LISTENs on CHANNEL, opened
+    with the first subscriber. Each subscriber gets a bounded queue; one that
+    falls behind is dropped rather than buffering without limit, and is
+    expected to reconnect and catch up through GET /members/changes.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers: set[Subscriber] = set()
+        self.received = 0
+        self.dropped = 0
+        self._conn = None
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, bind) -> Subscriber:
+        async with self._lock:
+            if self._conn is None or self._conn.is_closed():
+                dsn = bind.url.set(drivername="postgresql").render_as_string(hide_password=False)
+                self._conn = await asyncpg.connect(dsn)
+                self._conn.add_termination_listener(self._on_terminated)
+                await self._conn.add_listener(CHANNEL, self._on_notification)
+        subscriber = Subscriber(self.queue_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def _on_notification(self, conn, pid, channel, payload: str) -> None:
+        self.received += 1
+        self.publish(payload)
+
+    def publish(self, payload) -> None:
+        for subscriber in list(self.subscribers):
+            if not subscriber.push(payload):
+                logging.warning("Dropping slow member event subscriber")
+                self.dropped += 1
+                self.unsubscribe(subscriber)
+                subscriber.drop()
+
+    def _on_terminated(self, conn) -> None:
+        # Events may have been missed; subscribers reconnect and resync
+        self._conn = None
+        for subscriber in list(self.subscribers):
+            self.unsubscribe(subscriber)
+            subscriber.drop()
+
+    async def close(self) -> None:
+        for subscriber in list(self.subscribers):
+            self.unsubscribe(subscriber)
+            subscriber.drop()
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            conn.remove_termination_listener(self._on_terminated)
+            await conn.close()
+
+    def stats(self) -> dict:
+        return {
+            "listening": self._conn is not None and not self._conn.is_closed(),
+            "subscribers": len(self.subscribers),
+            "received": self.received,
+            "dropped": self.dropped,
+        }
+
+
+member_events = MemberEventHub(MEMBER_EVENTS_QUEUE_SIZE)
+
+
+async def event_stream(subscriber: Subscriber, heartbeat: float = MEMBER_EVENTS_HEARTBEAT_SECONDS):
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if payload is DROPPED:
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            yield f"event: members\ndata: {payload}\n\n"
+    finally:
+        member_events.unsubscribe(subscriber)
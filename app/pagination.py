@@ -0,0 +1,47 @@
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values) -> str:
+    # Opaque to clients: url-safe base64 of the sort key of the last row served
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(cursor)
+    return values
+
+
+def decode_followers_cursor(cursor: str) -> tuple[int, int]:
+    followers, member_id = decode_cursor(cursor, 2)
+    if not all(type(v) is int for v in (followers, member_id)):
+        raise InvalidCursor(cursor)
+    return followers, member_id
+
+
+def decode_changes_cursor(cursor: str) -> tuple[datetime, int]:
+    updated_at, member_id = decode_cursor(cursor, 2)
+    if not isinstance(updated_at, str) or type(member_id) is not int:
+        raise InvalidCursor(cursor)
+    try:
+        updated_at = datetime.fromisoformat(updated_at)
+    except ValueError as e:
+        raise InvalidCursor(cursor) from e
+    if updated_at.tzinfo is None:
+        raise InvalidCursor(cursor)
+    return updated_at, member_id
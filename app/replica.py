@@ -0,0 +1,151 @@
+import logging
+from contextvars import ContextVar
+
+from fastapi import Depends, Request
+from sqlalchemy import Text, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from shared.db.connection import engine, get_session
+
+from .changes import on_members_changed
+from .config import MEMBER_REPLICA_DATABASE_URL, MEMBER_REPLICA_LSN_COOKIE_MAX_AGE
+
+LSN_HEADER = "X-Member-LSN"
+LSN_COOKIE = "member_lsn"
+
+# Set per request by ReadYourWritesMiddleware and flagged by any committed write
+_request_writes: ContextVar[dict | None] = ContextVar("request_writes", default=None)
+
+
+def parse_lsn(value: str | None) -> int | None:
+    # pg_lsn text form is two hex halves, e.g. 16/B374D848
+    if not value:
+        return None
+    try:
+        hi, lo = value.split("/")
+        return (int(hi, 16) << 32) | int(lo, 16)
+    except ValueError:
+        return None
+
+
+class ReplicaRouter:
+    """Sends reads to a replica unless the client has writes it has not replayed.
+
+    Writers get the primary's WAL position after their commit as a header and
+    cookie. A read carrying one goes to the primary until the replica's replay
+    position reaches it. A replica that is not in recovery (the primary itself
+    standing in for one) is always caught up.
+    """
+
+    def __init__(self, url: str):
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self._replayed = 0
+        self.engine = None
+        self.sessions = None
+        if url:
+            self.configure(url)
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine is not None
+
+    def configure(self, url: str, **engine_options) -> None:
+        self.engine = create_async_engine(url, **engine_options)
+        self.sessions = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self._replayed = 0
+
+    async def replayed_lsn(self) -> int | None:
+        async with self.engine.connect() as conn:
+            lsn = await conn.scalar(select(cast(func.pg_last_wal_replay_lsn(), Text)))
+        return parse_lsn(lsn) if lsn is not None else None
+
+    async def caught_up(self, lsn: int) -> bool:
+        # Replay only moves forward, so a position seen once needs no new query
+        if lsn <= self._replayed:
+            return True
+        replayed = await self.replayed_lsn()
+        if replayed is None:
+            return True
+        self._replayed = max(self._replayed, replayed)
+        return lsn <= self._replayed
+
+    async def close(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = self.sessions = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "replayed_lsn": self._replayed,
+        }
+
+
+replica_router = ReplicaRouter(MEMBER_REPLICA_DATABASE_URL)
+
+
+async def get_read_session(request: Request, session: AsyncSession = Depends(get_session)):
+    # The primary session is lazy, so it costs nothing when the replica is used
+    if not replica_router.enabled:
+        yield session
+        return
+    token = parse_lsn(request.headers.get(LSN_HEADER) or request.cookies.get(LSN_COOKIE))
+    # Per-process caches may hold replica data read before this client's write
+    # was replayed, even once the replica has caught up, so they are skipped
+    request.state.reads_own_writes = token is not None
+    if token is not None and not await replica_router.caught_up(token):
+        replica_router.primary_reads += 1
+        yield session
+        return
+    replica_router.replica_reads += 1
+    async with replica_router.sessions() as replica_session:
+        yield replica_session
+
+
+def reads_own_writes(request: Request) -> bool:
+    return getattr(request.state, "reads_own_writes", False)
+
+
+@on_members_changed
+def _flag_request_write(ids) -> None:
+    writes = _request_writes.get()
+    if writes is not None:
+        writes["wrote"] = True
+
+
+class ReadYourWritesMiddleware:
+    """Attaches the primary's WAL position to responses of requests that wrote."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_router.enabled:
+            return await self.app(scope, receive, send)
+
+        writes = {"wrote": False}
+        token = _request_writes.set(writes)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and writes["wrote"]:
+                try:
+                    async with engine.connect() as conn:
+                        lsn = await conn.scalar(select(cast(func.pg_current_wal_lsn(), Text)))
+                except Exception:
+                    # Without a position the client may read stale data, but the write itself succeeded
+                    logging.exception("Failed to read the primary WAL position")
+                    return await send(message)
+                cookie = f"{LSN_COOKIE}={lsn}; Path=/; Max-Age={MEMBER_REPLICA_LSN_COOKIE_MAX_AGE}; HttpOnly; SameSite=Lax"
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (LSN_HEADER.lower().encode(), lsn.encode()),
+                    (b"set-cookie", cookie.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_writes.reset(token)
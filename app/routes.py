@@ -1,65 +1,597 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, desc
+from sqlalchemy import select, update, desc, func, not_, or_, tuple_, any_, column, table
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from shared.db.connection import get_session
+from shared.db.connection import engine, get_session
 from shared.utils.logging import log_exceptions
+from pydantic import ValidationError
+from datetime import timedelta
 import logging
-from .models import MemberDB
-from .schemas import MemberCreate, MemberOut
+import orjson
+import re
+from .cache import member_list_cache
+from .counters import counter_coalescer, counter_values
+from .changes import members_changed
+from .config import MEMBER_CHANGES_LAG_SECONDS, MEMBER_SEARCH_SIMILARITY
+from .crud import find_conflicts, insert_members, upsert_member, violated_index
+from .dataloader import member_loader, member_lookup_query
+from .etag import etag_matches, make_etag
+from .filters import MemberFilters, member_filters, member_list_query
+from .group_commit import CreateRejected, group_committer
+from .jobs import Job, job_registry, soft_delete_all_job
+from .leaderboard import leaderboard, member_rankings
+from .models import MemberDB, search_document
+from .notifications import event_stream, member_events, notify_members
+from .replica import get_read_session, reads_own_writes
+from .pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursor,
+    decode_changes_cursor,
+    decode_followers_cursor,
+    encode_cursor,
+)
+from .schemas import (
+    BulkMemberResponse,
+    BulkMemberResult,
+    CounterDelta,
+    JobOut,
+    MemberChangeOut,
+    MemberCreate,
+    MemberDelete,
+    MemberDeleteResponse,
+    MemberLookup,
+    MemberLookupResponse,
+    MemberOut,
+    MemberRankOut,
+    MemberUpsert,
+    RankedMemberOut,
+)
+from .serialization import (
+    JSON_OPTIONS,
+    MEMBER_OUT_COLUMNS,
+    MEMBER_OUT_FIELDS,
+    dump_member,
+    dump_member_lines,
+    dump_members,
+    member_columns,
+    member_fields,
+)
 
 router = APIRouter()
 
+MAX_BULK_MEMBERS = 10_000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+SOFT_DELETE_ALL_JOB = "soft_delete_all"
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Most followed members scanned for prefix matches before falling back to the prefix indexes
+SEARCH_PREFIX_PROBE = 2000
+SEARCH_PREFIX_COLUMNS = ("login", "first_name", "last_name", "email")
+
+async def _stream_members(session: AsyncSession, query, fields):
+    # Server-side cursor: rows arrive in fixed-size batches and are written out
+    # as they come, so memory does not grow with the table
+    try:
+        result = await session.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for batch in result.partitions():
+            yield dump_member_lines(batch, fields)
+    finally:
+        await session.close()
+
+async def _load_members(request: Request, session: AsyncSession, ids) -> dict[int, dict | None]:
+    if not reads_own_writes(request):
+        return await member_loader.load_many(session.bind or engine, ids)
+    # Read-your-writes: from the read session, past the loader's cache
+    result = await session.execute(member_lookup_query(ids))
+    members = {row.id: row._asdict() for row in result}
+    return {member_id: members.get(member_id) for member_id in dict.fromkeys(ids)}
+
 @router.post("/members", response_model=MemberOut)
 @log_exceptions
 async def create_member(payload: MemberCreate, session: AsyncSession = Depends(get_session)):
+    if group_committer.enabled:
+        # Committed together with other concurrent creates; same responses as below
+        try:
+            member = await group_committer.create(session.bind or engine, payload)
+        except CreateRejected as e:
+            raise HTTPException(status_code=400, detail=e.detail)
+        members_changed([member.id])
+        return member
     try:
-        # Create new member
-        new_member = MemberDB(**payload.model_dump())
-        session.add(new_member)
+        # Duplicates are skipped by ON CONFLICT DO NOTHING instead of aborting the transaction
+        created = await insert_members(session, [payload])
+        new_member = created.get(payload.login)
+        if new_member is None:
+            taken_logins, taken_emails = await find_conflicts(session, [payload.login], [payload.email])
+            await session.rollback()
+            if taken_logins:
+                raise HTTPException(status_code=400, detail="Login already exists")
+            if taken_emails:
+                raise HTTPException(status_code=400, detail="Email already exists")
+            # The conflicting member was deleted in the meantime
+            raise HTTPException(status_code=400, detail="Database error")
+        member = MemberOut.model_validate(new_member)
+        await notify_members(session, "created", [member.id])
+        await session.commit()
+        members_changed([member.id])
+        return member
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logging.error(f"Failed to create member: {e}")
+        raise HTTPException(status_code=400, detail="Database error")
+
+@router.put("/members/by-login/{login}", response_model=MemberOut)
+@log_exceptions
+async def upsert_member_by_login(login: str, payload: MemberUpsert, session: AsyncSession = Depends(get_session)):
+    try:
+        member = MemberOut.model_validate(await upsert_member(session, login, payload))
+        await notify_members(session, "updated", [member.id])
         await session.commit()
-        await session.refresh(new_member)
-        return new_member
     except IntegrityError as e:
         await session.rollback()
-        error_msg = str(e.orig).lower() if e.orig else str(e).lower()
-        logging.error(f"IntegrityError: {error_msg}")  # Log the exact error message
-        if "duplicate key value violates unique constraint" in error_msg:
-            if "login" in error_msg:
-                raise HTTPException(status_code=400, detail="Login already exists")
-            if "email" in error_msg:
-                raise HTTPException(status_code=400, detail="Email already exists")
+        # The login index is the conflict target, so only the email index can still fire
+        if violated_index(e) == "ix_members_email_unique":
+            raise HTTPException(status_code=400, detail="Email already exists")
         raise HTTPException(status_code=400, detail="Database error")
-    except SQLAlchemyError as e:
+    except SQLAlchemyError:
         await session.rollback()
         raise HTTPException(status_code=400, detail="Database error")
+    members_changed([member.id])
+    return member
+
+@router.post("/members/bulk", response_model=BulkMemberResponse)
+@log_exceptions
+async def create_members_bulk(
+    payload: list[dict[str, Any]] = Body(...),
+    session: AsyncSession = Depends(get_session),
+):
+    if len(payload) > MAX_BULK_MEMBERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_MEMBERS} members per request")
+
+    # Validate every row up front; invalid rows and in-batch duplicates never reach the DB
+    results: list[BulkMemberResult | None] = [None] * len(payload)
+    pending: list[tuple[int, MemberCreate]] = []
+    batch_logins, batch_emails = set(), set()
+    for index, row in enumerate(payload):
+        try:
+            member = MemberCreate.model_validate(row)
+        except ValidationError as e:
+            detail = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'body'}: {err['msg']}" for err in e.errors()
+            )
+            results[index] = BulkMemberResult(index=index, status="invalid", detail=detail)
+            continue
+        if member.login in batch_logins:
+            results[index] = BulkMemberResult(index=index, status="duplicate_login")
+        elif member.email in batch_emails:
+            results[index] = BulkMemberResult(index=index, status="duplicate_email")
+        else:
+            batch_logins.add(member.login)
+            batch_emails.add(member.email)
+            pending.append((index, member))
+
+    try:
+        # Rows the database still refuses are reported as invalid, one by one
+        rejected: dict[str, str] = {}
+        created = await insert_members(session, [member for _, member in pending], rejected)
+        skipped = [(i, m) for i, m in pending if m.login not in created and m.login not in rejected]
+        taken_logins, _ = await find_conflicts(
+            session, [m.login for _, m in skipped], [m.email for _, m in skipped]
+        )
+        for index, member in pending:
+            if member.login in created:
+                results[index] = BulkMemberResult(
+                    index=index, status="created", member=MemberOut.model_validate(created[member.login])
+                )
+            elif member.login in rejected:
+                results[index] = BulkMemberResult(index=index, status="invalid", detail=rejected[member.login])
+            elif member.login in taken_logins:
+                results[index] = BulkMemberResult(index=index, status="duplicate_login")
+            else:
+                results[index] = BulkMemberResult(index=index, status="duplicate_email")
+        if created:
+            await notify_members(session, "created", [m.id for m in created.values()])
+        await session.commit()
+    except SQLAlchemyError:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Database error")
+
+    if created:
+        members_changed(m.id for m in created.values())
+    return BulkMemberResponse(created=len(created), results=results)
+
+@router.post("/members/lookup", response_model=MemberLookupResponse)
+@log_exceptions
+async def lookup_members(
+    request: Request,
+    payload: MemberLookup,
+    fields: tuple[str, ...] = Depends(member_fields),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if len(payload.ids) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} ids per request")
+    found = await _load_members(request, session, payload.ids)
+    body = {
+        "members": [{name: m[name] for name in fields} for m in found.values() if m is not None],
+        "not_found": [member_id for member_id, m in found.items() if m is None],
+    }
+    return Response(content=orjson.dumps(body, option=JSON_OPTIONS), media_type="application/json")
 
 @router.get("/members", response_model=list[MemberOut])
 @log_exceptions
-async def get_members(session: AsyncSession = Depends(get_session)):
+async def get_members(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    stream: bool = False,
+    filters: MemberFilters = Depends(member_filters),
+    fields: tuple[str, ...] = Depends(member_fields),
+    session: AsyncSession = Depends(get_read_session),
+):
+    # Without limit/cursor the full list is returned, as before
+    stream = stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    page_size = limit or (DEFAULT_PAGE_SIZE if cursor and not stream else None)
+    after = None
+    if cursor:
+        try:
+            after = decode_followers_cursor(cursor)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def page_query(columns, limit):
+        query = member_list_query(filters, columns)
+        if after:
+            query = query.where(tuple_(MemberDB.followers, MemberDB.id) < tuple_(*after))
+        return query.limit(limit) if limit else query
+
+    if stream:
+        # NDJSON, one member per line; a limit is honoured but no next cursor is sent
+        query = page_query(member_columns(fields), page_size)
+        return StreamingResponse(_stream_members(session, query, fields), media_type=NDJSON_MEDIA_TYPE)
+
+    if_none_match = request.headers.get("if-none-match")
+    cache_key = (page_size, cursor, filters, fields)
+    # A client reading its own writes must not get a body cached before they were replayed
+    cached = None if reads_own_writes(request) else member_list_cache.get(cache_key)
+    if cached is not None:
+        body, headers = cached
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def page_headers(rows) -> dict:
+        # Every write bumps updated_at, so the (id, updated_at) pairs of the
+        # page fingerprint it without serializing it
+        headers = {}
+        if page_size and len(rows) > page_size:
+            rows = rows[:page_size]
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1].followers, rows[-1].id)
+        headers["ETag"] = make_etag(
+            page_size, cursor, *filters.key(), *fields, *(f"{r.id}@{r.updated_at.isoformat()}" for r in rows)
+        )
+        return headers
+
+    # Fetch one extra row to know whether there is a next page
+    fetch_size = page_size + 1 if page_size else None
+    version = member_list_cache.version
+    if if_none_match:
+        # Revalidation reads only the narrow page keys; full rows only on a mismatch
+        keys_query = page_query((MemberDB.followers, MemberDB.id, MemberDB.updated_at), fetch_size)
+        headers = page_headers((await session.execute(keys_query)).all())
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+    # The tag is recomputed from the rows served, so it always matches this body
+    query = page_query(member_columns(fields, "followers", "id", "updated_at"), fetch_size)
+    members = (await session.execute(query)).all()
+    headers = page_headers(members)
+    body = dump_members(members[:page_size] if page_size else members, fields)
+    member_list_cache.set(cache_key, (body, headers), version)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def changes_cutoff():
+    # A writer's rows carry its transaction start as updated_at and are not
+    # visible until it commits, so nothing at or after the oldest open
+    # transaction's start can be handed out yet, however long it has been open.
+    # Transactions that have not written yet count too: they may still write.
+    activity = table(
+        "pg_stat_activity", column("pid"), column("xact_start"), column("datname"), column("backend_type")
+    )
+    oldest_transaction = (
+        select(func.min(activity.c.xact_start))
+        .where(
+            activity.c.datname == func.current_database(),
+            activity.c.backend_type == "client backend",
+            activity.c.pid != func.pg_backend_pid(),
+        )
+        .scalar_subquery()
+    )
+    return func.least(func.statement_timestamp() - timedelta(seconds=MEMBER_CHANGES_LAG_SECONDS), oldest_transaction)
+
+@router.get("/members/changes", response_model=list[MemberChangeOut])
+@log_exceptions
+async def get_member_changes(
+    since: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_session),
+):
+    # Every create, update and soft delete bumps updated_at, so (updated_at, id)
+    # orders all changes; soft-deleted members come back as tombstones until
+    # they are archived. Pass X-Next-Cursor as `since` to get the next changes.
+    # Read from the primary: the cutoff depends on its in-flight writers, and a
+    # replica may not have replayed every row below it yet.
+    query = (
+        select(*MEMBER_OUT_COLUMNS, MemberDB.deleted)
+        .where(MemberDB.updated_at < changes_cutoff())
+        .order_by(MemberDB.updated_at, MemberDB.id)
+        .limit(limit)
+    )
+    if since:
+        try:
+            after = decode_changes_cursor(since)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(MemberDB.updated_at, MemberDB.id) > tuple_(*after))
+
+    rows = (await session.execute(query)).all()
+    changes = [
+        {
+            "id": row.id,
+            "deleted": row.deleted,
+            "updated_at": row.updated_at,
+            "member": None if row.deleted else dict(zip(MEMBER_OUT_FIELDS, row)),
+        }
+        for row in rows
+    ]
+    # With nothing new the same cursor is handed back, so consumers can keep polling
+    headers = {}
+    if rows:
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].updated_at.isoformat(), rows[-1].id)
+    elif since:
+        headers["X-Next-Cursor"] = since
+    return Response(content=orjson.dumps(changes, option=JSON_OPTIONS), media_type="application/json", headers=headers)
+
+@router.get("/members/events")
+@log_exceptions
+async def get_member_events(session: AsyncSession = Depends(get_session)):
+    # Server-Sent Events; every process shares one LISTEN connection among its
+    # subscribers. After an "event: dropped" reconnect and resync from /members/changes.
+    subscriber = await member_events.subscribe(session.bind or engine)
+    return StreamingResponse(
+        event_stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _prefix_match(columns, pattern: str):
+    return or_(*(func.lower(getattr(columns, name)).like(pattern) for name in SEARCH_PREFIX_COLUMNS))
+
+@router.get("/members/search", response_model=list[MemberOut])
+@log_exceptions
+async def search_members(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    fields: tuple[str, ...] = Depends(member_fields),
+    session: AsyncSession = Depends(get_read_session),
+):
+    term = q.strip().lower()
+    if not term:
+        raise HTTPException(status_code=400, detail="Empty search query")
+    pattern = re.sub(r"([\\%_])", r"\\\1", term) + "%"
+    prefix_match = _prefix_match(MemberDB, pattern)
+
+    # Prefix matches come first, most followed first. A common prefix is found
+    # among the most followed members without reading the rest of the table
+    searched = ("followers", "id", *SEARCH_PREFIX_COLUMNS)
+    probed = (
+        select(*member_columns(fields, *searched))
+        .where(MemberDB.deleted == False)
+        .order_by(desc(MemberDB.followers), desc(MemberDB.id))
+        .limit(SEARCH_PREFIX_PROBE)
+        .subquery("probed")
+    )
+    result = await session.execute(
+        select(*(probed.c[name] for name in fields))
+        .where(_prefix_match(probed.c, pattern))
+        .order_by(desc(probed.c.followers), desc(probed.c.id))
+        .limit(limit)
+    )
+    members = result.all()
+    if len(members) < limit:
+        # A rarer prefix has few matches, so they are collected from the prefix
+        # indexes and sorted. MATERIALIZED keeps the planner from walking the
+        # followers index instead and filtering the whole table.
+        matches = (
+            select(*member_columns(fields, "followers", "id"))
+            .where(MemberDB.deleted == False, prefix_match)
+            .cte("prefix_matches")
+            .prefix_with("MATERIALIZED", dialect="postgresql")
+        )
+        result = await session.execute(
+            select(*(matches.c[name] for name in fields))
+            .order_by(desc(matches.c.followers), desc(matches.c.id))
+            .limit(limit)
+        )
+        members = result.all()
+    if len(members) < limit:
+        # Typo-tolerant fallback: document %> term keeps word_similarity(term, document)
+        # above the threshold, and <->> walks the GiST index nearest first
+        document = search_document()
+        await session.execute(
+            select(func.set_config("pg_trgm.word_similarity_threshold", str(MEMBER_SEARCH_SIMILARITY), True))
+        )
+        result = await session.execute(
+            select(*member_columns(fields))
+            .where(MemberDB.deleted == False, document.op("%>")(term), not_(prefix_match))
+            .order_by(document.op("<->>")(term))
+            .limit(limit - len(members))
+        )
+        members += result.all()
+    return Response(content=dump_members(members, fields), media_type="application/json")
+
+@router.get("/members/top", response_model=list[RankedMemberOut])
+@log_exceptions
+async def get_top_members(
+    n: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    fields: tuple[str, ...] = Depends(member_fields),
+    session: AsyncSession = Depends(get_read_session),
+):
+    # Reads the first n entries of the rank index instead of sorting the table
     result = await session.execute(
-        select(MemberDB).where(MemberDB.deleted == False).order_by(desc(MemberDB.followers))
+        select(*member_columns(fields), member_rankings.c.rank)
+        .join_from(member_rankings, MemberDB, MemberDB.id == member_rankings.c.id)
+        .where(MemberDB.deleted == False)
+        .order_by(member_rankings.c.rank)
+        .limit(n)
     )
-    return result.scalars().all()
+    body = dump_members(result.all(), fields + ("rank",))
+    return Response(content=body, media_type="application/json")
 
-@router.delete("/members")
+@router.get("/members/{member_id}/rank", response_model=MemberRankOut)
+@log_exceptions
+async def get_member_rank(member_id: int, session: AsyncSession = Depends(get_read_session)):
+    result = await session.execute(
+        select(MemberDB.followers, member_rankings.c.rank)
+        .outerjoin_from(MemberDB, member_rankings, member_rankings.c.id == MemberDB.id)
+        .where(MemberDB.id == member_id, MemberDB.deleted == False)
+    )
+    member = result.one_or_none()
+    if member is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+    if member.rank is not None:
+        return MemberRankOut(id=member_id, rank=member.rank, followers=member.followers, as_of=leaderboard.refreshed_at)
+
+    # Created after the last refresh: count the members ahead of it on the followers index
+    ahead = await session.scalar(
+        select(func.count())
+        .select_from(MemberDB)
+        .where(
+            MemberDB.deleted == False,
+            tuple_(MemberDB.followers, MemberDB.id) > tuple_(member.followers, member_id),
+        )
+    )
+    return MemberRankOut(id=member_id, rank=ahead + 1, followers=member.followers, as_of=None)
+
+@router.get("/members/{member_id}", response_model=MemberOut)
+@log_exceptions
+async def get_member(
+    member_id: int,
+    request: Request,
+    fields: tuple[str, ...] = Depends(member_fields),
+    session: AsyncSession = Depends(get_read_session),
+):
+    # Concurrent lookups are merged into one query and served from a per-id cache
+    member = (await _load_members(request, session, [member_id]))[member_id]
+    if member is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+    etag = make_etag(member_id, member["updated_at"].isoformat(), *fields)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=dump_member(member, fields), media_type="application/json", headers={"ETag": etag})
+
+@router.delete("/members", status_code=202, response_model=JobOut)
 @log_exceptions
 async def soft_delete_members(session: AsyncSession = Depends(get_session)):
-    await session.execute(update(MemberDB).values(deleted=True).where(MemberDB.deleted == False))
-    await session.commit()
-    return {"message": "Members soft deleted"}
+    # Runs as a background job in short id-range batches; poll GET /members/jobs/{id}
+    result = await session.execute(
+        select(func.min(MemberDB.id), func.max(MemberDB.id)).where(MemberDB.deleted == False)
+    )
+    first_id, last_id = result.one()
+    job = job_registry.running(SOFT_DELETE_ALL_JOB)
+    if job is not None:
+        # Members created since the running job started are deleted by it too
+        job.extend(first_id, last_id)
+        return job
+    job = Job(kind=SOFT_DELETE_ALL_JOB, first_id=first_id, last_id=last_id)
+    job_registry.start(job, soft_delete_all_job(session.bind or engine))
+    return job
+
+@router.post("/members/delete", response_model=MemberDeleteResponse)
+@log_exceptions
+async def soft_delete_members_by_id(payload: MemberDelete, session: AsyncSession = Depends(get_session)):
+    if len(payload.ids) > MAX_BULK_MEMBERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_MEMBERS} ids per request")
+    ids = list(dict.fromkeys(payload.ids))
+    try:
+        result = await session.execute(
+            update(MemberDB)
+            .values(deleted=True, updated_at=func.now())
+            .where(MemberDB.id == any_(ids), MemberDB.deleted == False)
+            .returning(MemberDB.id)
+        )
+        deleted = set(result.scalars())
+        if deleted:
+            await notify_members(session, "deleted", [i for i in ids if i in deleted])
+        await session.commit()
+    except SQLAlchemyError:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Database error")
+    if deleted:
+        members_changed(deleted)
+    return MemberDeleteResponse(
+        deleted=[i for i in ids if i in deleted],
+        not_found=[i for i in ids if i not in deleted],
+    )
+
+@router.get("/members/jobs/{job_id}", response_model=JobOut)
+@log_exceptions
+async def get_member_job(job_id: str):
+    job = job_registry.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/members/{member_id}/counters", response_model=MemberOut)
+@log_exceptions
+async def update_member_counters(
+    member_id: int,
+    payload: CounterDelta,
+    coalesce: bool = False,
+    session: AsyncSession = Depends(get_session),
+):
+    if coalesce:
+        # Merged with other increments and written within MEMBER_COUNTER_FLUSH_MS
+        counter_coalescer.add(session.bind or engine, member_id, payload.followers, payload.following)
+        return JSONResponse(status_code=202, content={"message": "Counter update queued"})
+
+    try:
+        result = await session.execute(
+            update(MemberDB)
+            .where(MemberDB.id == member_id, MemberDB.deleted == False)
+            .values(counter_values(payload.followers, payload.following))
+            .returning(*MEMBER_OUT_COLUMNS)
+        )
+        member = result.one_or_none()
+        if member is not None:
+            await notify_members(session, "updated", [member_id])
+            await session.commit()
+    except SQLAlchemyError:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Database error")
+    if member is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+    members_changed([member_id])
+    return member._mapping
 
 @router.delete("/members/{member_id}")
 @log_exceptions
 async def soft_delete_member(member_id: int, session: AsyncSession = Depends(get_session)):
     result = await session.execute(
         update(MemberDB)
-        .values(deleted=True)
+        .values(deleted=True, updated_at=func.now())
         .where(MemberDB.id == member_id, MemberDB.deleted == False)
         .returning(MemberDB.id)
     )
     deleted_id = result.scalar_one_or_none()
     if not deleted_id:
         raise HTTPException(status_code=404, detail="Member not found")
+    await notify_members(session, "deleted", [member_id])
     await session.commit()
+    members_changed([member_id])
     return {"message": f"Member {member_id} soft deleted"}
@@ -1,7 +1,17 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional
+from pydantic import AfterValidator, BaseModel, EmailStr, ConfigDict, Field
+from typing import Annotated, Literal, Optional
 from datetime import datetime
 
+def _no_nul(value: str) -> str:
+    if "\x00" in value:
+        raise ValueError("must not contain NUL bytes")
+    return value
+
+# What the integer and text columns can store; checked here so a bad row is
+# rejected on its own instead of failing the statement it is batched into
+Int32 = Annotated[int, Field(ge=-2**31, le=2**31 - 1)]
+Text = Annotated[str, AfterValidator(_no_nul)]
+
 class MemberBase(BaseModel):
     first_name: str
     last_name: str
@@ -13,15 +23,28 @@ class MemberBase(BaseModel):
     following: int = 0
 
 class MemberCreate(BaseModel):
-    first_name: str
-    last_name: str
-    login: str
-    avatar_url: str | None = None
-    followers: int = 0
-    following: int = 0
-    title: str | None = None
+    first_name: Text
+    last_name: Text
+    login: Text
+    avatar_url: Text | None = None
+    followers: Int32 = 0
+    following: Int32 = 0
+    title: Text | None = None
     email: EmailStr
 
+class MemberUpsert(BaseModel):
+    first_name: Text
+    last_name: Text
+    avatar_url: Text | None = None
+    followers: Int32 = 0
+    following: Int32 = 0
+    title: Text | None = None
+    email: EmailStr
+
+class CounterDelta(BaseModel):
+    followers: Int32 = 0
+    following: Int32 = 0
+
 class Member(MemberCreate):
     id: int
     deleted: bool
@@ -44,3 +67,66 @@ class MemberOut(BaseModel):
     email: str
     created_at: datetime
     updated_at: datetime
+
+class RankedMemberOut(MemberOut):
+    rank: int
+
+class MemberRankOut(BaseModel):
+    id: int
+    rank: int
+    followers: int | None
+    # When the precomputed ranking was last refreshed; None if computed live
+    as_of: datetime | None
+
+class BulkMemberResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate_login", "duplicate_email", "invalid"]
+    member: MemberOut | None = None
+    detail: str | None = None
+
+class BulkMemberResponse(BaseModel):
+    created: int
+    results: list[BulkMemberResult]
+
+class MemberLookup(BaseModel):
+    ids: list[int]
+
+class MemberLookupResponse(BaseModel):
+    members: list[MemberOut]
+    not_found: list[int]
+
+class MemberChangeOut(BaseModel):
+    id: int
+    deleted: bool
+    updated_at: datetime
+    # None for tombstones of soft-deleted members
+    member: MemberOut | None
+
+class MemberDelete(BaseModel):
+    ids: list[int]
+
+class MemberDeleteResponse(BaseModel):
+    deleted: list[int]
+    not_found: list[int]
+
+class JobOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    kind: str
+    status: str
+    first_id: int | None
+    last_id: int | None
+    current_id: int | None
+    batches_done: int
+    rows_updated: int
+    error: str | None
+    requests: int
+    created_at: datetime
+    finished_at: datetime | None
+
+class ArchiveOut(BaseModel):
+    rows_moved: int
+    batches: int
+    cutoff: datetime
+    elapsed_seconds: float
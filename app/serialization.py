@@ -0,0 +1,45 @@
+import orjson
+from fastapi import HTTPException, Query
+
+from .models import MemberDB
+from .schemas import MemberOut
+
+# Reads select exactly the MemberOut columns as plain rows and encode them
+# straight to JSON bytes, skipping ORM instances and Pydantic validation.
+# OPT_UTC_Z renders UTC datetimes with a trailing "Z", matching Pydantic.
+MEMBER_OUT_FIELDS = tuple(MemberOut.model_fields)
+MEMBER_OUT_COLUMNS = tuple(getattr(MemberDB, name) for name in MEMBER_OUT_FIELDS)
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dump_members(rows, fields=MEMBER_OUT_FIELDS) -> bytes:
+    return orjson.dumps([dict(zip(fields, row)) for row in rows], option=JSON_OPTIONS)
+
+
+def dump_member_lines(rows, fields=MEMBER_OUT_FIELDS) -> bytes:
+    return b"".join(
+        orjson.dumps(dict(zip(fields, row)), option=JSON_OPTIONS | orjson.OPT_APPEND_NEWLINE) for row in rows
+    )
+
+
+def dump_member(member: dict, fields=MEMBER_OUT_FIELDS) -> bytes:
+    return orjson.dumps({name: member[name] for name in fields}, option=JSON_OPTIONS)
+
+
+def member_fields(fields: str | None = Query(None, description="Comma-separated MemberOut fields")) -> tuple[str, ...]:
+    # Output keeps the MemberOut field order whatever order was requested
+    if fields is None:
+        return MEMBER_OUT_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(MEMBER_OUT_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise HTTPException(status_code=400, detail="No fields requested")
+    return tuple(name for name in MEMBER_OUT_FIELDS if name in requested)
+
+
+def member_columns(fields=MEMBER_OUT_FIELDS, *extra: str) -> tuple:
+    # Extra columns (e.g. the cursor keys) go last, so dump_members' zip drops them
+    names = fields + tuple(name for name in extra if name not in fields)
+    return tuple(getattr(MemberDB, name) for name in names)
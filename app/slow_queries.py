@@ -0,0 +1,148 @@
+import logging
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from .config import MEMBER_SLOW_QUERY_EXPLAIN_SAMPLE, MEMBER_SLOW_QUERY_LOG_SIZE, MEMBER_SLOW_QUERY_MS
+
+# ASGI scope of the request being served; FastAPI adds scope["route"] once routed
+current_scope: ContextVar[dict | None] = ContextVar("current_scope", default=None)
+
+
+class RequestContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+def redact(parameters) -> list[str]:
+    # Only the shape of the parameters is kept; values can be personal data
+    if isinstance(parameters, dict):
+        parameters = parameters.values()
+    redacted = []
+    for value in parameters or ():
+        if isinstance(value, (list, tuple)):
+            redacted.append(f"<{type(value).__name__}[{len(value)}]>")
+        else:
+            redacted.append(f"<{type(value).__name__}>")
+    return redacted
+
+
+def current_route() -> str | None:
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return route.name if route is not None else scope.get("path")
+
+
+class SlowQueryLog:
+    """Ring buffer of statements that took longer than threshold_ms.
+
+    Opt-in: nothing is hooked until install() is called. For a sample of the
+    slow SELECTs the statement is re-run with EXPLAIN (ANALYZE, BUFFERS) on a
+    fresh DBAPI cursor of the same connection, so the plan is taken in the same
+    transaction and no SQLAlchemy events fire for it. Writes are never
+    explained, since ANALYZE executes the statement again.
+    """
+
+    def __init__(self, threshold_ms: float, size: int, explain_sample: float):
+        self.threshold_ms = threshold_ms
+        self.explain_sample = explain_sample
+        self.entries: deque = deque(maxlen=size)
+        self.recorded = 0
+        self._engines = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._engines)
+
+    def install(self, engine) -> None:
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+        self._engines.append(sync_engine)
+
+    def uninstall(self) -> None:
+        for sync_engine in self._engines:
+            event.remove(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+            event.remove(sync_engine, "handle_error", self._handle_error)
+        self._engines = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["slow_query_started"].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+        pool_wait = conn.info.get("pool_wait_seconds")
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(elapsed_ms, 3),
+            "statement": statement,
+            "parameters": [redact(p) for p in parameters] if executemany else redact(parameters),
+            "route": current_route(),
+            "pool_wait_ms": round(pool_wait * 1000, 3) if pool_wait is not None else None,
+            "plan": None,
+        }
+        if not executemany and self._should_explain(statement, context):
+            entry["plan"] = self._explain(conn, statement, parameters)
+        self.entries.append(entry)
+        self.recorded += 1
+
+    def _handle_error(self, context):
+        started = context.connection.info.get("slow_query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    def _should_explain(self, statement: str, context) -> bool:
+        if not self.explain_sample or random.random() >= self.explain_sample:
+            return False
+        # A server-side cursor still has its portal open on this connection
+        if context is not None and context.execution_options.get("stream_results"):
+            return False
+        # WITH may wrap a data-modifying CTE and pg_notify would notify twice,
+        # so only plain SELECTs qualify
+        return statement.lstrip()[:6].upper() == "SELECT" and "pg_notify" not in statement
+
+    def _explain(self, conn, statement, parameters) -> list[str] | None:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            logging.warning(f"Failed to EXPLAIN slow query: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.recorded = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "explain_sample": self.explain_sample,
+            "recorded": self.recorded,
+            # Newest first
+            "queries": list(reversed(self.entries)),
+        }
+
+
+slow_query_log = SlowQueryLog(MEMBER_SLOW_QUERY_MS, MEMBER_SLOW_QUERY_LOG_SIZE, MEMBER_SLOW_QUERY_EXPLAIN_SAMPLE)
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import literal_column, select
+from sqlalchemy.exc import OperationalError
+
+from .config import MEMBER_DB_BACKOFF_BASE, MEMBER_DB_BACKOFF_MAX, MEMBER_DB_CONNECT_ATTEMPTS
+
+# Relations created by Base.metadata.create_all hooks rather than by its
+# tables: the leaderboard view and its indexes
+SCHEMA_RELATIONS = ("member_rankings", "ix_member_rankings_id", "ix_member_rankings_rank")
+
+
+@dataclass
+class StartupState:
+    ready: bool = False
+    connect_attempts: int = 0
+    schema_created: bool = False
+    prewarmed: int = 0
+    startup_seconds: float | None = None
+
+
+startup_state = StartupState()
+
+
+def backoff_delay(attempt: int, base: float = MEMBER_DB_BACKOFF_BASE, cap: float = MEMBER_DB_BACKOFF_MAX) -> float:
+    # Full jitter: replicas restarted together do not retry in lockstep
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def wait_for_database(engine, attempts: int = MEMBER_DB_CONNECT_ATTEMPTS) -> int:
+    for attempt in range(attempts):
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(select(1))
+            return attempt + 1
+        except (OperationalError, OSError) as e:
+            if attempt + 1 == attempts:
+                raise RuntimeError(f"Database failed to connect after {attempts} attempts") from e
+            delay = backoff_delay(attempt)
+            logging.warning(f"DB not ready (attempt {attempt + 1}/{attempts}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+def schema_relations(metadata) -> list[str]:
+    # Every table and index, so a deployment created before an index was
+    # added still gets it; otherwise queries silently fall back to seq scans
+    names = [table.name for table in metadata.sorted_tables]
+    names += [index.name for table in metadata.sorted_tables for index in table.indexes]
+    return names + list(SCHEMA_RELATIONS)
+
+
+async def schema_present(conn, metadata) -> bool:
+    names = schema_relations(metadata)
+    result = await conn.execute(select(*(literal_column(f"to_regclass('{name}')") for name in names)))
+    return all(oid is not None for oid in result.one())
+
+
+def create_schema(conn, metadata) -> None:
+    # create_all skips the indexes of tables that already exist, so they are
+    # checked one by one; its hooks (pg_trgm, the leaderboard view) are idempotent
+    metadata.create_all(conn)
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+async def prewarm_pool(engine, count: int, statements=()) -> int:
+    # Connections are held at the same time so the pool really opens `count`
+    # of them; running the statements fills each connection's prepared statement cache
+    async def open_one():
+        conn = await engine.connect()
+        try:
+            for statement in statements:
+                await conn.execute(statement)
+            await conn.rollback()
+        except BaseException:
+            await conn.close()
+            raise
+        return conn
+
+    if count <= 0:
+        return 0
+    results = await asyncio.gather(*(open_one() for _ in range(count)), return_exceptions=True)
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+    if len(opened) < count:
+        logging.warning(f"Pre-warmed {len(opened)} of {count} database connections")
+    return len(opened)
+
+
+async def start_database(engine, metadata, prewarm: int, statements=()) -> None:
+    started = time.perf_counter()
+    startup_state.connect_attempts = await wait_for_database(engine)
+    async with engine.begin() as conn:
+        if not await schema_present(conn, metadata):
+            await conn.run_sync(create_schema, metadata)
+            startup_state.schema_created = True
+    startup_state.prewarmed = await prewarm_pool(engine, prewarm, statements)
+    startup_state.startup_seconds = time.perf_counter() - started
+    startup_state.ready = True
@@ -0,0 +1,74 @@
+"""Measure the per-request cost of metrics collection.
+
+Drives a trivial ASGI app directly, with and without MetricsMiddleware, so the
+difference is the middleware overhead alone; Histogram.observe is timed on its
+own as well. Target: a few microseconds per request.
+
+    python -m benchmarks.bench_metrics --requests 200000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.metrics import Histogram, LATENCY_BUCKETS, MetricsMiddleware
+
+
+class Route:
+    name = "get_members"
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"[]"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def drive(app, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/members"}, receive, send)
+    return time.perf_counter() - started
+
+
+def best_of(repeat: int, fn) -> float:
+    return min(fn() for _ in range(repeat))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per variant, the best one is reported")
+    args = parser.parse_args(argv)
+
+    bare = best_of(args.repeat, lambda: asyncio.run(drive(endpoint, args.requests)))
+    wrapped = best_of(args.repeat, lambda: asyncio.run(drive(MetricsMiddleware(endpoint), args.requests)))
+
+    histogram = Histogram("bench_seconds", "", LATENCY_BUCKETS, ("route",))
+    def observe() -> float:
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            histogram.observe(0.003, ("get_members",))
+        return time.perf_counter() - started
+    observed = best_of(args.repeat, observe)
+
+    per_request = lambda seconds: seconds / args.requests * 1e6
+    print(json.dumps({
+        "requests": args.requests,
+        "bare_us_per_request": per_request(bare),
+        "middleware_us_per_request": per_request(wrapped),
+        "overhead_us_per_request": per_request(wrapped - bare),
+        "histogram_observe_us": per_request(observed),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare rows/sec of the two GET /members read paths.
+
+orm:  select(MemberDB) -> ORM instances -> MemberOut(from_attributes) -> JSON
+core: select(MemberOut columns) -> plain rows -> orjson
+
+By default both paths serialize synthetic in-memory rows, which isolates the
+Python-side cost. With --database-url the rows are read from an existing
+members table, so query execution and object construction are included.
+
+    python -m benchmarks.bench_serialization --rows 50000
+    python -m benchmarks.bench_serialization --database-url postgresql+asyncpg://user:pw@localhost/db
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from pydantic import TypeAdapter
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import MemberDB
+from app.schemas import MemberOut
+from app.serialization import MEMBER_OUT_COLUMNS, MEMBER_OUT_FIELDS, dump_members
+
+member_list_adapter = TypeAdapter(list[MemberOut])
+
+
+def synthetic_rows(count: int) -> list[tuple]:
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        (
+            i, f"First{i}", f"Last{i}", f"login{i}", f"https://avatars.example.com/u/{i}",
+            i % 5000, i % 300, "Engineer" if i % 3 else None, f"user{i}@example.com",
+            base + timedelta(seconds=i), base + timedelta(seconds=i, microseconds=i % 1000),
+        )
+        for i in range(count)
+    ]
+
+
+def orm_path(rows) -> bytes:
+    members = [MemberDB(**dict(zip(MEMBER_OUT_FIELDS, row))) for row in rows]
+    return member_list_adapter.dump_json(member_list_adapter.validate_python(members, from_attributes=True))
+
+
+def core_path(rows) -> bytes:
+    return dump_members(rows)
+
+
+def measure(fn, rows, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return {"seconds": best, "rows_per_second": len(rows) / best, "bytes": len(body)}
+
+
+async def measure_db(database_url: str, repeat: int) -> dict:
+    engine = create_async_engine(database_url)
+    order = (desc(MemberDB.followers), desc(MemberDB.id))
+    results = {}
+    try:
+        async with AsyncSession(engine) as session:
+            for name in ("orm", "core"):
+                best, count = float("inf"), 0
+                for _ in range(repeat):
+                    session.expunge_all()
+                    started = time.perf_counter()
+                    if name == "orm":
+                        result = await session.execute(select(MemberDB).where(MemberDB.deleted == False).order_by(*order))
+                        members = result.scalars().all()
+                        member_list_adapter.dump_json(member_list_adapter.validate_python(members, from_attributes=True))
+                    else:
+                        result = await session.execute(select(*MEMBER_OUT_COLUMNS).where(MemberDB.deleted == False).order_by(*order))
+                        members = result.all()
+                        dump_members(members)
+                    best = min(best, time.perf_counter() - started)
+                    count = len(members)
+                results[name] = {"seconds": best, "rows_per_second": count / best if best else 0.0, "rows": count}
+    finally:
+        await engine.dispose()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000, help="synthetic rows to serialize")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path, the best one is reported")
+    parser.add_argument("--database-url", help="read rows from this database instead of synthesizing them")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        report = {"mode": "database", **asyncio.run(measure_db(args.database_url, args.repeat))}
+    else:
+        rows = synthetic_rows(args.rows)
+        orm, core = measure(orm_path, rows, args.repeat), measure(core_path, rows, args.repeat)
+        assert json.loads(orm_path(rows[:100])) == json.loads(core_path(rows[:100]))
+        report = {"mode": "synthetic", "rows": args.rows, "orm": orm, "core": core}
+    report["speedup"] = report["core"]["rows_per_second"] / report["orm"]["rows_per_second"]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
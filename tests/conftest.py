@@ -7,6 +7,8 @@ from fastapi import FastAPI
 from httpx import AsyncClient, ASGITransport
 from shared.db.base import Base
 from app.main import app as fastapi_app
+from app.cache import member_list_cache
+from app.dataloader import member_loader
 from shared.db.connection import get_session
 
 # Create test database engine
@@ -49,6 +51,8 @@ async def app(db_session):
         yield db_session
 
     fastapi_app.dependency_overrides[get_session] = _get_test_session
+    member_list_cache.clear()  # Cached responses must not leak between tests
+    member_loader.clear()
     yield fastapi_app
     fastapi_app.dependency_overrides.clear()
 
@@ -0,0 +1,94 @@
+import json
+import pytest
+from sqlalchemy import select
+from app import bulk_load
+from app.bulk_load import load_file
+from app.models import MemberDB
+from conftest import TEST_DATABASE_URL
+
+TEST_DSN = TEST_DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+@pytest.mark.asyncio
+async def test_load_jsonl(db_session, tmp_path):
+    db_session.add(MemberDB(first_name="Old", last_name="Member", login="taken", email="taken@example.com"))
+    await db_session.commit()
+
+    rows = [
+        {"first_name": "A", "last_name": "One", "login": "load1", "email": "load1@example.com", "followers": 4},
+        {"first_name": "B", "last_name": "Two", "login": "taken", "email": "load2@example.com"},
+        {"first_name": "C", "last_name": "Three", "login": "load3", "email": "not-an-email"},
+        {"first_name": "D", "last_name": "Four", "login": "load1", "email": "load4@example.com"},
+        {"first_name": "E", "last_name": "Five", "login": "load5", "email": "load5@example.com"},
+    ]
+    path = tmp_path / "members.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n{broken\n")
+
+    report = await load_file(path, batch_size=2, dsn=TEST_DSN)
+    assert report.read == 6
+    assert report.staged == 4
+    assert report.loaded == 2
+    assert [(r["lineno"], r["reason"]) for r in report.rejected] == [
+        (2, "conflicts with an existing member"),
+        (3, report.rejected[1]["reason"]),
+        (4, "duplicate in file"),
+        (6, report.rejected[3]["reason"]),
+    ]
+    assert "email" in report.rejected[1]["reason"]
+    assert report.rejected[3]["reason"].startswith("invalid JSON")
+
+    result = await db_session.execute(
+        select(MemberDB.login, MemberDB.followers, MemberDB.deleted).where(MemberDB.login.like("load%")).order_by(MemberDB.login)
+    )
+    assert result.all() == [("load1", 4, False), ("load5", 0, False)]
+
+@pytest.mark.asyncio
+async def test_load_csv(db_session, tmp_path):
+    path = tmp_path / "members.csv"
+    path.write_text(
+        "first_name,last_name,login,email,followers,title\n"
+        "A,One,csv1,csv1@example.com,2,Engineer\n"
+        "B,Two,csv2,csv2@example.com,,\n"
+    )
+
+    report = await load_file(path, dsn=TEST_DSN)
+    assert report.loaded == 2
+    assert report.rejected == []
+
+    result = await db_session.execute(
+        select(MemberDB.login, MemberDB.followers, MemberDB.title).order_by(MemberDB.login)
+    )
+    assert result.all() == [("csv1", 2, "Engineer"), ("csv2", 0, None)]
+
+@pytest.mark.asyncio
+async def test_load_rejects_values_the_columns_cannot_hold(db_session, tmp_path, monkeypatch):
+    rows = [
+        {"first_name": "A", "last_name": "One", "login": "big1", "email": "big1@example.com"},
+        {"first_name": "B", "last_name": "Two", "login": "big2", "email": "big2@example.com", "followers": 2**31},
+        {"first_name": "C\u0000", "last_name": "Three", "login": "big3", "email": "big3@example.com"},
+        {"first_name": "D", "last_name": "Four", "login": "big4", "email": "big4@example.com"},
+    ]
+    path = tmp_path / "members.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n")
+
+    report = await load_file(path, batch_size=2, dsn=TEST_DSN)
+    assert report.loaded == 2
+    assert [r["lineno"] for r in report.rejected] == [2, 3]
+    assert "followers" in report.rejected[0]["reason"]
+    assert "NUL" in report.rejected[1]["reason"]
+
+    # Rows that get past validation but that COPY refuses are rejected one by one
+    def unvalidated(lineno, row, report):
+        return (lineno, *(row.get(c, 0 if c in ("followers", "following") else None) for c in bulk_load.COLUMNS))
+
+    monkeypatch.setattr(bulk_load, "_validate", unvalidated)
+    for row in rows:
+        row["login"] = row["login"].replace("big", "raw")
+        row["email"] = row["email"].replace("big", "raw")
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n")
+    report = await load_file(path, batch_size=10, dsn=TEST_DSN)
+    assert report.loaded == 2
+    assert [r["lineno"] for r in report.rejected] == [2, 3]
+    assert all(r["reason"].startswith("refused by the database") for r in report.rejected)
+
+    result = await db_session.execute(select(MemberDB.login).order_by(MemberDB.login))
+    assert result.scalars().all() == ["big1", "big4", "raw1", "raw4"]
@@ -0,0 +1,50 @@
+from unittest.mock import patch
+from app.cache import ResponseCache
+
+def test_cache_lru_eviction():
+    cache = ResponseCache(maxsize=2, ttl=60)
+    cache.set("a", 1, cache.version)
+    cache.set("b", 2, cache.version)
+    assert cache.get("a") == 1
+    cache.set("c", 3, cache.version)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+def test_cache_ttl_expiry():
+    cache = ResponseCache(maxsize=2, ttl=5)
+    with patch("app.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1, cache.version)
+    with patch("app.cache.time.monotonic", return_value=104.0):
+        assert cache.get("a") == 1
+    with patch("app.cache.time.monotonic", return_value=106.0):
+        assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+def test_cache_invalidate_rejects_stale_writes():
+    cache = ResponseCache(maxsize=2, ttl=60)
+    version = cache.version
+    cache.set("a", 1, version)
+    cache.invalidate()
+    assert cache.get("a") is None
+    # A result computed before the invalidation is not stored
+    cache.set("a", 1, version)
+    assert cache.get("a") is None
+
+def test_cache_disabled():
+    cache = ResponseCache(maxsize=2, ttl=0)
+    cache.set("a", 1, cache.version)
+    assert cache.get("a") is None
+    assert cache.stats()["enabled"] is False
+
+def test_cache_invalidate_keys():
+    cache = ResponseCache(maxsize=4, ttl=60)
+    version = cache.version
+    cache.set(1, "a", version)
+    cache.set(2, "b", version)
+    cache.invalidate([1])
+    assert cache.get(1) is None
+    assert cache.get(2) == "b"
+    cache.set(1, "a", version)
+    assert cache.get(1) is None
@@ -0,0 +1,16 @@
+from app.etag import etag_matches, make_etag
+
+def test_make_etag_is_stable_and_quoted():
+    etag = make_etag(3, "2024-01-01T00:00:00+00:00", None)
+    assert etag == make_etag(3, "2024-01-01T00:00:00+00:00", None)
+    assert etag != make_etag(4, "2024-01-01T00:00:00+00:00", None)
+    assert etag.startswith('"') and etag.endswith('"')
+
+def test_etag_matches():
+    etag = make_etag("a")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import pytest
+from app.group_commit import CreateRejected, group_committer
+from app.notifications import member_events
+from app.schemas import MemberCreate
+
+@pytest.fixture
+def group_commit():
+    settings = (group_committer.enabled, group_committer.max_rows, group_committer.max_wait)
+    group_committer.enabled, group_committer.max_rows, group_committer.max_wait = True, 500, 0.02
+    group_committer.submitted = group_committer.flushes = group_committer.rows_created = 0
+    yield group_committer
+    group_committer.enabled, group_committer.max_rows, group_committer.max_wait = settings
+
+def member(login, email=None):
+    return {"first_name": "Group", "last_name": login, "login": login, "email": email or f"{login}@example.com"}
+
+@pytest.mark.asyncio
+async def test_group_commit_preserves_responses(async_client, group_commit):
+    group_commit.enabled = False
+    await async_client.post("/members", json=member("existing"))
+    group_commit.enabled = True
+
+    payloads = [member(f"group{i}") for i in range(10)] + [
+        member("existing", "other@example.com"),
+        member("new", "existing@example.com"),
+        member("group0", "dup@example.com"),
+        member("dup", "group1@example.com"),
+    ]
+    responses = await asyncio.gather(*(async_client.post("/members", json=p) for p in payloads))
+
+    created = responses[:10]
+    assert all(r.status_code == 200 for r in created)
+    assert [r.json()["login"] for r in created] == [f"group{i}" for i in range(10)]
+    assert len({r.json()["id"] for r in created}) == 10
+    assert [(r.status_code, r.json()["detail"]) for r in responses[10:]] == [
+        (400, "Login already exists"),
+        (400, "Email already exists"),
+        (400, "Login already exists"),
+        (400, "Email already exists"),
+    ]
+    assert (group_commit.submitted, group_commit.flushes, group_commit.rows_created) == (14, 1, 10)
+
+    # Written and invalidated like any other create
+    response = await async_client.get(f"/members/{created[3].json()['id']}")
+    assert response.json() == created[3].json()
+    response = await async_client.get("/members")
+    assert len(response.json()) == 11
+
+@pytest.mark.asyncio
+async def test_group_commit_flushes_full_batches(async_client, db_session, group_commit):
+    group_commit.max_rows, group_commit.max_wait = 4, 10
+    subscriber = await member_events.subscribe(db_session.bind)
+    try:
+        responses = await asyncio.gather(*(async_client.post("/members", json=member(f"full{i}")) for i in range(8)))
+        assert all(r.status_code == 200 for r in responses)
+        assert group_commit.flushes == 2
+        # One NOTIFY per flush
+        events = [json.loads(await asyncio.wait_for(subscriber.queue.get(), 2)) for _ in range(2)]
+        assert sorted(len(e["ids"]) for e in events) == [4, 4]
+    finally:
+        await member_events.close()
+
+@pytest.mark.asyncio
+async def test_group_commit_close_flushes_pending(async_client, group_commit):
+    group_commit.max_wait = 10
+    request = asyncio.create_task(async_client.post("/members", json=member("closing")))
+    while not group_commit.stats()["pending"]:
+        await asyncio.sleep(0.001)
+    await group_commit.close()
+    response = await request
+    assert response.status_code == 200
+    assert response.json()["login"] == "closing"
+
+@pytest.mark.asyncio
+async def test_group_commit_rejects_only_refused_rows(async_client, db_session, group_commit):
+    # Past request validation, as a value the schema lets through would be
+    payloads = [MemberCreate(**member(f"mixed{i}")) for i in range(4)]
+    payloads[1] = MemberCreate.model_construct(**member("mixed1"), followers=2**31, following=0)
+    outcomes = await asyncio.gather(
+        *(group_commit.create(db_session.bind, p) for p in payloads), return_exceptions=True
+    )
+    assert isinstance(outcomes[1], CreateRejected) and outcomes[1].detail == "Database error"
+    assert [o.login for i, o in enumerate(outcomes) if i != 1] == ["mixed0", "mixed2", "mixed3"]
+    assert (group_commit.flushes, group_commit.rows_created) == (1, 3)
+
+    response = await async_client.get("/members")
+    assert sorted(m["login"] for m in response.json()) == ["mixed0", "mixed2", "mixed3"]
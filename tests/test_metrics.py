@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import select
+from app.metrics import Histogram, instrument_engine, registry
+
+def test_histogram_render():
+    histogram = Histogram("latency_seconds", "Latency", (0.1, 1), ("route",))
+    histogram.observe(0.05, ("a",))
+    histogram.observe(0.1, ("a",))
+    histogram.observe(5, ("a",))
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="a",le="0.1"} 2',
+        'latency_seconds_bucket{route="a",le="1"} 2',
+        'latency_seconds_bucket{route="a",le="+Inf"} 3',
+        'latency_seconds_sum{route="a"} 5.15',
+        'latency_seconds_count{route="a"} 3',
+    ]
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(async_client, db_session):
+    registry.reset()
+    instrument_engine(db_session.bind, pool_gauges=False)
+
+    await async_client.post("/members", json={
+        "first_name": "Metric",
+        "last_name": "User",
+        "login": "metric",
+        "email": "metric@example.com"
+    })
+    await async_client.get("/members")
+    await async_client.delete("/members/999999")
+    await async_client.get("/no-such-route")
+    await db_session.execute(select(1))
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'http_requests_total{route="create_member",method="POST",status="200"} 1' in text
+    assert 'http_requests_total{route="get_members",method="GET",status="200"} 1' in text
+    assert 'http_requests_total{route="soft_delete_member",method="DELETE",status="404"} 1' in text
+    assert 'http_requests_total{route="unmatched",method="GET",status="404"} 1' in text
+    assert 'http_request_duration_seconds_count{route="get_members"} 1' in text
+    assert 'http_response_size_bytes_bucket{route="get_members",le="+Inf"} 1' in text
+    assert 'db_query_duration_seconds_count{statement="SELECT"}' in text
+    assert 'db_query_duration_seconds_count{statement="INSERT"}' in text
+    assert "db_pool_wait_seconds_count" in text
+    assert "# TYPE db_pool_checked_out gauge" in text
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import pytest
+from app.notifications import DROPPED, MemberEventHub, Subscriber, event_stream, member_events
+
+async def next_event(subscriber, timeout=2):
+    return json.loads(await asyncio.wait_for(subscriber.queue.get(), timeout))
+
+@pytest.fixture
+async def subscriber(db_session):
+    subscriber = await member_events.subscribe(db_session.bind)
+    yield subscriber
+    await member_events.close()
+
+@pytest.mark.asyncio
+async def test_writes_notify_subscribers(async_client, subscriber):
+    received = member_events.received
+    response = await async_client.post("/members", json={
+        "first_name": "Event",
+        "last_name": "User",
+        "login": "event",
+        "email": "event@example.com"
+    })
+    member_id = response.json()["id"]
+    assert await next_event(subscriber) == {"event": "created", "ids": [member_id]}
+
+    await async_client.post(f"/members/{member_id}/counters", json={"followers": 1})
+    assert await next_event(subscriber) == {"event": "updated", "ids": [member_id]}
+
+    await async_client.delete(f"/members/{member_id}")
+    assert await next_event(subscriber) == {"event": "deleted", "ids": [member_id]}
+
+    # Rejected writes roll back and notify nobody
+    await async_client.delete(f"/members/{member_id}")
+    await async_client.post("/members/delete", json={"ids": [member_id]})
+    assert subscriber.queue.empty()
+
+    stats = (await async_client.get("/admin/events")).json()
+    assert stats["listening"] and stats["subscribers"] == 1 and stats["received"] == received + 3
+
+@pytest.mark.asyncio
+async def test_one_listen_connection_fans_out(async_client, db_session, subscriber):
+    others = [await member_events.subscribe(db_session.bind) for _ in range(50)]
+    connection = member_events._conn
+    response = await async_client.post("/members/bulk", json=[
+        {"first_name": "Fan", "last_name": str(i), "login": f"fan{i}", "email": f"fan{i}@example.com"}
+        for i in range(2)
+    ])
+    ids = [r["member"]["id"] for r in response.json()["results"]]
+    for s in [subscriber, *others]:
+        assert await next_event(s) == {"event": "created", "ids": ids}
+    assert member_events._conn is connection
+
+def test_slow_subscriber_is_dropped():
+    hub = MemberEventHub(queue_size=2)
+    fast, slow = Subscriber(2), Subscriber(2)
+    hub.subscribers.update({fast, slow})
+    for i in range(2):
+        hub.publish(str(i))
+        fast.queue.get_nowait()
+    hub.publish("2")
+    assert not fast.dropped and fast.queue.get_nowait() == "2"
+    assert slow.dropped and slow not in hub.subscribers
+    assert slow.queue.get_nowait() is DROPPED
+    assert hub.dropped == 1
+
+@pytest.mark.asyncio
+async def test_event_stream_format(subscriber):
+    stream = event_stream(subscriber, heartbeat=0.01)
+    assert await anext(stream) == "retry: 3000\n\n"
+    assert await anext(stream) == ": keep-alive\n\n"
+    subscriber.push('{"event":"created","ids":[1]}')
+    assert await anext(stream) == 'event: members\ndata: {"event":"created","ids":[1]}\n\n'
+    subscriber.drop()
+    assert await anext(stream) == "event: dropped\ndata: {}\n\n"
+    with pytest.raises(StopAsyncIteration):
+        await anext(stream)
+    assert subscriber not in member_events.subscribers
@@ -0,0 +1,20 @@
+import pytest
+from datetime import datetime, timezone
+from app.pagination import InvalidCursor, decode_changes_cursor, decode_followers_cursor, encode_cursor
+
+def test_followers_cursor_round_trip():
+    cursor = encode_cursor(42, 7)
+    assert "=" not in cursor
+    assert decode_followers_cursor(cursor) == (42, 7)
+
+@pytest.mark.parametrize("cursor", ["", "!!!", encode_cursor(1), encode_cursor("1", 2), encode_cursor(1, 2, 3)])
+def test_followers_cursor_rejects_garbage(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_followers_cursor(cursor)
+
+def test_changes_cursor_round_trip():
+    updated_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    assert decode_changes_cursor(encode_cursor(updated_at.isoformat(), 9)) == (updated_at, 9)
+    for values in [("2024-05-01T12:30:15", 9), ("yesterday", 9), (5, 9), ("2024-05-01T12:30:15+00:00", "9")]:
+        with pytest.raises(InvalidCursor):
+            decode_changes_cursor(encode_cursor(*values))
@@ -0,0 +1,109 @@
+from unittest.mock import AsyncMock, patch
+import pytest
+from sqlalchemy import update
+from sqlalchemy.pool import NullPool
+from app.models import MemberDB
+from app.replica import LSN_HEADER, parse_lsn, replica_router
+from conftest import TEST_DATABASE_URL
+
+def test_parse_lsn():
+    assert parse_lsn("0/16B3748") == 0x16B3748
+    assert parse_lsn("16/B374D848") == (0x16 << 32) | 0xB374D848
+    assert parse_lsn("16/B374D848") > parse_lsn("15/FFFFFFFF")
+    for value in (None, "", "garbage", "1/2/3", "x/1"):
+        assert parse_lsn(value) is None
+
+@pytest.fixture
+async def replica(db_session):
+    # The test database stands in for the replica; it is not in recovery, so it
+    # always counts as caught up unless replayed_lsn is patched
+    replica_router.configure(TEST_DATABASE_URL, poolclass=NullPool)
+    replica_router.replica_reads = replica_router.primary_reads = 0
+    yield replica_router
+    await replica_router.close()
+
+@pytest.mark.asyncio
+async def test_writes_return_lsn(async_client, replica):
+    response = await async_client.post("/members", json={
+        "first_name": "Replica",
+        "last_name": "User",
+        "login": "replica",
+        "email": "replica@example.com"
+    })
+    assert response.status_code == 200
+    lsn = response.headers[LSN_HEADER]
+    assert parse_lsn(lsn) is not None
+    assert response.cookies["member_lsn"] == lsn
+
+    # Reads and rejected writes carry no position
+    response = await async_client.get("/members")
+    assert LSN_HEADER not in response.headers
+    response = await async_client.delete("/members/999999")
+    assert LSN_HEADER not in response.headers
+
+@pytest.mark.asyncio
+async def test_reads_follow_replica_lag(async_client, replica):
+    response = await async_client.post("/members", json={
+        "first_name": "Lag",
+        "last_name": "User",
+        "login": "lag",
+        "email": "lag@example.com"
+    })
+    member_id = response.json()["id"]
+    lsn = response.headers[LSN_HEADER]
+    async_client.cookies.clear()
+
+    await async_client.get("/members")
+    assert (replica.replica_reads, replica.primary_reads) == (1, 0)
+
+    # Replica still behind the client's write: the read goes to the primary,
+    # bypassing the per-process caches
+    with patch.object(replica, "replayed_lsn", AsyncMock(return_value=0)):
+        response = await async_client.get(f"/members/{member_id}", headers={LSN_HEADER: lsn})
+        assert response.json()["login"] == "lag"
+        async_client.cookies.set("member_lsn", lsn)
+        response = await async_client.get("/members")
+        assert [m["login"] for m in response.json()] == ["lag"]
+        async_client.cookies.clear()
+    assert (replica.replica_reads, replica.primary_reads) == (1, 2)
+
+    # Caught up: back on the replica, and the replay position is remembered
+    with patch.object(replica, "replayed_lsn", AsyncMock(return_value=parse_lsn(lsn))) as replayed:
+        await async_client.get("/members", headers={LSN_HEADER: lsn})
+        await async_client.get("/members", headers={LSN_HEADER: lsn})
+    assert replayed.await_count == 1
+    stats = (await async_client.get("/admin/replica")).json()
+    assert stats["enabled"] and (stats["replica_reads"], stats["primary_reads"]) == (3, 2)
+
+@pytest.mark.asyncio
+async def test_single_instance_is_always_caught_up(replica):
+    assert await replica.replayed_lsn() is None
+    assert await replica.caught_up(parse_lsn("FFFF/FFFFFFFF"))
+
+@pytest.mark.asyncio
+async def test_reads_with_token_skip_caches(async_client, db_session, replica):
+    response = await async_client.post("/members", json={
+        "first_name": "Cached",
+        "last_name": "User",
+        "login": "cached",
+        "email": "cached@example.com"
+    })
+    member_id = response.json()["id"]
+    lsn = response.headers[LSN_HEADER]
+    async_client.cookies.clear()
+
+    assert (await async_client.get(f"/members/{member_id}")).json()["followers"] == 0
+    assert (await async_client.get("/members")).json()[0]["followers"] == 0
+
+    # Written behind the caches' back, like a replica read cached before the
+    # write was replayed; the replica counts as caught up with the token
+    await db_session.execute(update(MemberDB).where(MemberDB.id == member_id).values(followers=42))
+    await db_session.commit()
+    assert (await async_client.get(f"/members/{member_id}")).json()["followers"] == 0
+    assert (await async_client.get("/members")).json()[0]["followers"] == 0
+
+    response = await async_client.get(f"/members/{member_id}", headers={LSN_HEADER: lsn})
+    assert response.json()["followers"] == 42
+    response = await async_client.get("/members", headers={LSN_HEADER: lsn})
+    assert response.json()[0]["followers"] == 42
+    assert replica.primary_reads == 0
@@ -1,11 +1,20 @@
+import asyncio
+import json
 import pytest
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from fastapi import HTTPException
 from unittest.mock import patch, AsyncMock, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
 from shared.db.connection import get_session
-from app.models import MemberDB
-from datetime import datetime, timezone
+from app.models import MemberArchiveDB, MemberDB
+from app.schemas import MemberCreate
+from app.cache import member_list_cache
+from app.counters import counter_coalescer
+from app.crud import insert_members
+from app.filters import MemberFilters, member_list_query
+from app.leaderboard import leaderboard
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import Integer, event, func, select, update
 
 # Helper class to track async function calls
 class AsyncFunctionTracker:
@@ -19,6 +28,17 @@ class AsyncFunctionTracker:
         self.call_count += 1
         return await self.func(*args, **kwargs)
 
+async def wait_for_job(async_client, job_id, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        response = await async_client.get(f"/members/jobs/{job_id}")
+        assert response.status_code == 200
+        job = response.json()
+        if job["status"] not in ("pending", "running"):
+            return job
+        assert asyncio.get_running_loop().time() < deadline, job
+        await asyncio.sleep(0.01)
+
 @pytest.mark.asyncio
 async def test_create_and_get_member(async_client):
     # Create
@@ -97,10 +117,9 @@ async def test_create_member_database_error(async_client, app):
     mock_session = AsyncMock(spec=AsyncSession)
 
     # Set up the mock methods
-    mock_session.add = MagicMock()  # Use MagicMock for synchronous add
-    mock_session.commit = AsyncMock(side_effect=SQLAlchemyError("Database error"))
+    mock_session.scalars = AsyncMock(side_effect=SQLAlchemyError("Database error"))
     mock_session.rollback = AsyncMock()
-    mock_session.refresh = AsyncMock()
+    mock_session.commit = AsyncMock()
 
     # Override the get_session dependency
     async def get_mock_session():
@@ -118,119 +137,57 @@ async def test_create_member_database_error(async_client, app):
         assert response.status_code == 400
         assert response.json()["detail"] == "Database error"
 
-        # Verify that rollback was called
+        # Verify that rollback was called and nothing was committed
         mock_session.rollback.assert_awaited_once()
+        mock_session.commit.assert_not_awaited()
     finally:
         app.dependency_overrides.clear()
 
 @pytest.mark.asyncio
-async def test_create_member_integrity_error(async_client, app):
-    # Create a mock session
-    mock_session = AsyncMock(spec=AsyncSession)
-    mock_session.add = MagicMock()
-
-    # Test login key violation with exact error message format
-    mock_session.commit = AsyncMock(side_effect=IntegrityError(
-        statement="INSERT INTO members",
-        params={},
-        orig="duplicate key value violates unique constraint members_login_key"
-    ))
-    mock_session.rollback = AsyncMock()
-
-    async def get_mock_session():
-        yield mock_session
-
-    app.dependency_overrides[get_session] = get_mock_session
-
-    try:
-        response = await async_client.post("/members", json={
-            "first_name": "Test",
-            "last_name": "User",
-            "login": "testuser",
-            "email": "test@example.com"
-        })
-        assert response.status_code == 400
-        assert response.json()["detail"] == "Login already exists"
-        mock_session.rollback.assert_awaited_once()
-    finally:
-        app.dependency_overrides.clear()
-
-    # Reset mocks for email test
-    mock_session = AsyncMock(spec=AsyncSession)
-    mock_session.add = MagicMock()
-
-    # Test email key violation with exact error message format
-    mock_session.commit = AsyncMock(side_effect=IntegrityError(
-        statement="INSERT INTO members",
-        params={},
-        orig="duplicate key value violates unique constraint members_email_key"
-    ))
-    mock_session.rollback = AsyncMock()
-
-    app.dependency_overrides[get_session] = get_mock_session
-
-    try:
-        response = await async_client.post("/members", json={
-            "first_name": "Test",
-            "last_name": "User",
-            "login": "anotheruser",
-            "email": "test@example.com"
-        })
-        assert response.status_code == 400
-        assert response.json()["detail"] == "Email already exists"
-        mock_session.rollback.assert_awaited_once()
-    finally:
-        app.dependency_overrides.clear()
-
-    # Test with different error message format for login
-    mock_session = AsyncMock(spec=AsyncSession)
-    mock_session.add = MagicMock()
-    mock_session.commit = AsyncMock(side_effect=IntegrityError(
-        statement="INSERT INTO members",
-        params={},
-        orig="duplicate key value violates unique constraint \"members_login_key\""
-    ))
-    mock_session.rollback = AsyncMock()
-
-    app.dependency_overrides[get_session] = get_mock_session
-
-    try:
-        response = await async_client.post("/members", json={
-            "first_name": "Test",
-            "last_name": "User",
-            "login": "testuser",
-            "email": "test@example.com"
-        })
-        assert response.status_code == 400
-        assert response.json()["detail"] == "Login already exists"
-        mock_session.rollback.assert_awaited_once()
-    finally:
-        app.dependency_overrides.clear()
-
-    # Test with different error message format for email
-    mock_session = AsyncMock(spec=AsyncSession)
-    mock_session.add = MagicMock()
-    mock_session.commit = AsyncMock(side_effect=IntegrityError(
-        statement="INSERT INTO members",
-        params={},
-        orig="duplicate key value violates unique constraint \"members_email_key\""
-    ))
-    mock_session.rollback = AsyncMock()
-
-    app.dependency_overrides[get_session] = get_mock_session
-
-    try:
-        response = await async_client.post("/members", json={
-            "first_name": "Test",
-            "last_name": "User",
-            "login": "anotheruser",
-            "email": "test@example.com"
-        })
-        assert response.status_code == 400
-        assert response.json()["detail"] == "Email already exists"
-        mock_session.rollback.assert_awaited_once()
-    finally:
-        app.dependency_overrides.clear()
+async def test_create_member_conflict_resolution(async_client, app):
+    # The insert skips the row (ON CONFLICT DO NOTHING), then the conflict lookup
+    # tells which unique index was hit
+    def mock_conflict_session(existing_rows):
+        mock_session = AsyncMock(spec=AsyncSession)
+        inserted = MagicMock()
+        inserted.all.return_value = []
+        mock_session.scalars = AsyncMock(return_value=inserted)
+        conflicts = MagicMock()
+        conflicts.all.return_value = existing_rows
+        mock_session.execute = AsyncMock(return_value=conflicts)
+        mock_session.rollback = AsyncMock()
+        mock_session.commit = AsyncMock()
+        return mock_session
+
+    cases = [
+        ([("testuser", "other@example.com")], "Login already exists"),
+        ([("otheruser", "test@example.com")], "Email already exists"),
+        ([("testuser", "test@example.com")], "Login already exists"),
+        # The conflicting member disappeared between the insert and the lookup
+        ([], "Database error"),
+    ]
+    for existing_rows, detail in cases:
+        mock_session = mock_conflict_session(existing_rows)
+
+        async def get_mock_session():
+            yield mock_session
+
+        app.dependency_overrides[get_session] = get_mock_session
+
+        try:
+            response = await async_client.post("/members", json={
+                "first_name": "Test",
+                "last_name": "User",
+                "login": "testuser",
+                "email": "test@example.com"
+            })
+            assert response.status_code == 400
+            assert response.json()["detail"] == detail
+            mock_session.scalars.assert_awaited_once()
+            mock_session.rollback.assert_awaited_once()
+            mock_session.commit.assert_not_awaited()
+        finally:
+            app.dependency_overrides.clear()
 
 @pytest.mark.asyncio
 async def test_get_members_database_error(async_client, app):
@@ -272,8 +229,10 @@ async def test_soft_delete_members(async_client):
 
     # Soft delete all members
     response = await async_client.delete("/members")
-    assert response.status_code == 200
-    assert response.json()["message"] == "Members soft deleted"
+    assert response.status_code == 202
+    job = await wait_for_job(async_client, response.json()["id"])
+    assert job["status"] == "completed"
+    assert job["rows_updated"] == 1
 
     # Verify member is not returned in get
     response = await async_client.get("/members")
@@ -310,10 +269,9 @@ async def test_soft_delete_members_database_error(async_client, app):
 async def test_create_member_generic_integrity_error(async_client, app):
     # Create a mock session
     mock_session = AsyncMock(spec=AsyncSession)
-    mock_session.add = MagicMock()
 
     # Test generic integrity error (not login or email)
-    mock_session.commit = AsyncMock(side_effect=IntegrityError(
+    mock_session.scalars = AsyncMock(side_effect=IntegrityError(
         statement="INSERT INTO members",
         params={},
         orig="some other constraint violation"
@@ -382,15 +340,14 @@ async def test_soft_delete_members_generic_error(async_client, app):
 
 @pytest.mark.asyncio
 async def test_create_member_success(async_client, app):
-    # Create a mock session that successfully adds and commits
+    # Create a mock session whose insert returns the new row
     mock_session = AsyncMock(spec=AsyncSession)
-    mock_session.add = MagicMock()
     mock_session.commit = AsyncMock()
 
     # Create timestamps for the mock
     now = datetime.now(timezone.utc)
 
-    # Create a member object that will be returned
+    # Create a member object that will be returned by INSERT ... RETURNING
     member = MemberDB(
         id=1,
         first_name="Test",
@@ -404,13 +361,9 @@ async def test_create_member_success(async_client, app):
         created_at=now,
         updated_at=now
     )
-
-    # Mock refresh to set the member object with timestamps
-    async def mock_refresh(member_obj):
-        member_obj.id = 1
-        member_obj.created_at = now
-        member_obj.updated_at = now
-    mock_session.refresh = AsyncMock(side_effect=mock_refresh)
+    inserted = MagicMock()
+    inserted.all.return_value = [member]
+    mock_session.scalars = AsyncMock(return_value=inserted)
 
     async def get_mock_session():
         yield mock_session
@@ -432,9 +385,10 @@ async def test_create_member_success(async_client, app):
         assert "updated_at" in data
         assert isinstance(datetime.fromisoformat(data["created_at"].replace('Z', '+00:00')), datetime)
         assert isinstance(datetime.fromisoformat(data["updated_at"].replace('Z', '+00:00')), datetime)
-        mock_session.add.assert_called_once()
+        # One INSERT ... RETURNING round trip and the NOTIFY, then the commit
+        mock_session.scalars.assert_awaited_once()
+        mock_session.execute.assert_awaited_once()
         mock_session.commit.assert_awaited_once()
-        mock_session.refresh.assert_awaited_once()
     finally:
         app.dependency_overrides.clear()
 
@@ -463,10 +417,11 @@ async def test_get_members_exception(async_client, app):
 
 @pytest.mark.asyncio
 async def test_soft_delete_members_success(async_client, app):
-    # Create a mock session that successfully executes and commits
+    # Create a mock session whose id bounds query finds no live members
     mock_session = AsyncMock(spec=AsyncSession)
-    mock_session.execute = AsyncMock()
-    mock_session.commit = AsyncMock()
+    bounds = MagicMock()
+    bounds.one.return_value = (None, None)
+    mock_session.execute = AsyncMock(return_value=bounds)
 
     async def get_mock_session():
         yield mock_session
@@ -475,10 +430,12 @@ async def test_soft_delete_members_success(async_client, app):
 
     try:
         response = await async_client.delete("/members")
-        assert response.status_code == 200
-        assert response.json()["message"] == "Members soft deleted"
+        assert response.status_code == 202
+        job = await wait_for_job(async_client, response.json()["id"])
+        assert job["status"] == "completed"
+        assert job["rows_updated"] == 0
+        assert job["batches_done"] == 0
         mock_session.execute.assert_awaited_once()
-        mock_session.commit.assert_awaited_once()
     finally:
         app.dependency_overrides.clear()
 
@@ -586,3 +543,986 @@ async def test_soft_delete_single_member_generic_error(async_client, app):
         mock_session.rollback.assert_awaited_once()
     finally:
         app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_get_members_keyset_pagination(async_client):
+    # Two members share a follower count so the id tie-breaker is exercised
+    for i, followers in enumerate([5, 10, 10, 1, 7]):
+        response = await async_client.post("/members", json={
+            "first_name": "Page",
+            "last_name": f"User{i}",
+            "login": f"page{i}",
+            "email": f"page{i}@example.com",
+            "followers": followers
+        })
+        assert response.status_code == 200
+
+    response = await async_client.get("/members")
+    expected = [m["id"] for m in response.json()]
+    assert "X-Next-Cursor" not in response.headers
+
+    seen = []
+    response = await async_client.get("/members", params={"limit": 2})
+    while True:
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(m["id"] for m in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = await async_client.get("/members", params={"limit": 2, "cursor": cursor})
+
+    assert seen == expected
+    followers = [m["followers"] for m in (await async_client.get("/members")).json()]
+    assert followers == sorted(followers, reverse=True)
+
+@pytest.mark.asyncio
+async def test_get_members_invalid_cursor(async_client):
+    response = await async_client.get("/members", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+    response = await async_client.get("/members", params={"limit": 0})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_get_members_stream_ndjson(async_client):
+    for i in range(3):
+        response = await async_client.post("/members", json={
+            "first_name": "Stream",
+            "last_name": f"User{i}",
+            "login": f"stream{i}",
+            "email": f"stream{i}@example.com",
+            "followers": i
+        })
+        assert response.status_code == 200
+
+    expected = (await async_client.get("/members")).json()
+
+    response = await async_client.get("/members", params={"stream": "true"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == expected
+
+    response = await async_client.get("/members", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
+
+    response = await async_client.get("/members", params={"stream": "true", "limit": 2})
+    assert [json.loads(line) for line in response.text.splitlines()] == expected[:2]
+
+@pytest.mark.asyncio
+async def test_create_members_bulk(async_client):
+    response = await async_client.post("/members", json={
+        "first_name": "Existing",
+        "last_name": "User",
+        "login": "existing",
+        "email": "existing@example.com"
+    })
+    assert response.status_code == 200
+
+    response = await async_client.post("/members/bulk", json=[
+        {"first_name": "A", "last_name": "One", "login": "bulk1", "email": "bulk1@example.com", "followers": 3},
+        {"first_name": "B", "last_name": "Two", "login": "existing", "email": "fresh@example.com"},
+        {"first_name": "C", "last_name": "Three", "login": "bulk3", "email": "existing@example.com"},
+        {"first_name": "D", "last_name": "Four", "login": "bulk4", "email": "invalid"},
+        {"first_name": "E", "last_name": "Five", "login": "bulk1", "email": "bulk5@example.com"},
+        {"first_name": "F", "last_name": "Six", "login": "bulk6", "email": "bulk1@example.com"},
+        {"first_name": "G", "last_name": "Seven", "login": "bulk7", "email": "bulk7@example.com"},
+    ])
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    statuses = [r["status"] for r in data["results"]]
+    assert statuses == [
+        "created", "duplicate_login", "duplicate_email", "invalid",
+        "duplicate_login", "duplicate_email", "created",
+    ]
+    assert [r["index"] for r in data["results"]] == list(range(7))
+    assert data["results"][0]["member"]["login"] == "bulk1"
+    assert data["results"][0]["member"]["followers"] == 3
+    assert "email" in data["results"][3]["detail"]
+
+    response = await async_client.get("/members")
+    assert sorted(m["login"] for m in response.json()) == ["bulk1", "bulk7", "existing"]
+
+@pytest.mark.asyncio
+async def test_create_members_bulk_out_of_range_row(async_client, db_session):
+    # Values the columns cannot hold fail their own row only
+    response = await async_client.post("/members/bulk", json=[
+        {"first_name": "A", "last_name": "One", "login": "range1", "email": "range1@example.com"},
+        {"first_name": "B", "last_name": "Two", "login": "range2", "email": "range2@example.com", "followers": 2**31},
+        {"first_name": "C\u0000", "last_name": "Three", "login": "range3", "email": "range3@example.com"},
+    ])
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 1
+    assert [r["status"] for r in data["results"]] == ["created", "invalid", "invalid"]
+    assert "followers" in data["results"][1]["detail"]
+    assert "NUL" in data["results"][2]["detail"]
+
+    # Rows that get past validation but are refused by Postgres are retried one by one
+    rows = [
+        MemberCreate(first_name="D", last_name="Four", login="range4", email="range4@example.com"),
+        MemberCreate.model_construct(
+            first_name="E", last_name="Five", login="range5", email="range5@example.com",
+            avatar_url=None, title=None, followers=2**31, following=0,
+        ),
+    ]
+    rejected = {}
+    created = await insert_members(db_session, rows, rejected)
+    await db_session.commit()
+    assert list(created) == ["range4"]
+    assert list(rejected) == ["range5"]
+    assert "int32" in rejected["range5"]
+
+@pytest.mark.asyncio
+async def test_create_members_bulk_database_error(async_client, app):
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_session.scalars = AsyncMock(side_effect=SQLAlchemyError("Database error"))
+    mock_session.rollback = AsyncMock()
+
+    async def get_mock_session():
+        yield mock_session
+
+    app.dependency_overrides[get_session] = get_mock_session
+
+    try:
+        response = await async_client.post("/members/bulk", json=[
+            {"first_name": "A", "last_name": "One", "login": "bulk1", "email": "bulk1@example.com"},
+        ])
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Database error"
+        mock_session.rollback.assert_awaited_once()
+    finally:
+        app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_get_members_cache(async_client):
+    response = await async_client.post("/members", json={
+        "first_name": "Cached",
+        "last_name": "User",
+        "login": "cached",
+        "email": "cached@example.com"
+    })
+    assert response.status_code == 200
+
+    first = await async_client.get("/members")
+    second = await async_client.get("/members")
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    stats = (await async_client.get("/admin/cache")).json()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+    # A write invalidates the cached list
+    response = await async_client.post("/members", json={
+        "first_name": "Second",
+        "last_name": "User",
+        "login": "second",
+        "email": "second@example.com"
+    })
+    assert response.status_code == 200
+    response = await async_client.get("/members")
+    assert {m["login"] for m in response.json()} == {"cached", "second"}
+
+    member_id = response.json()[0]["id"]
+    await async_client.delete(f"/members/{member_id}")
+    response = await async_client.get("/members")
+    assert len(response.json()) == 1
+
+    response = await async_client.delete("/members")
+    await wait_for_job(async_client, response.json()["id"])
+    response = await async_client.get("/members")
+    assert response.json() == []
+    assert (await async_client.get("/admin/cache")).json()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_get_members_etag(async_client, db_session):
+    response = await async_client.post("/members", json={
+        "first_name": "Etag",
+        "last_name": "User",
+        "login": "etag",
+        "email": "etag@example.com"
+    })
+    assert response.status_code == 200
+
+    response = await async_client.get("/members")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = await async_client.get("/members", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    # Different pages have different tags
+    response = await async_client.get("/members", params={"limit": 1}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # A write changes the tag, and so does a soft delete with the cache disabled
+    await async_client.post("/members", json={
+        "first_name": "Other",
+        "last_name": "User",
+        "login": "other",
+        "email": "other@example.com"
+    })
+    response = await async_client.get("/members", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    etag = response.headers["ETag"]
+
+    member_id = response.json()[0]["id"]
+    with patch.object(member_list_cache, "ttl", 0):
+        # Revalidating reads only ids and updated_at, never the full rows
+        statements = []
+        capture = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db_session.bind.sync_engine, "before_cursor_execute", capture)
+        try:
+            response = await async_client.get("/members", headers={"If-None-Match": etag})
+        finally:
+            event.remove(db_session.bind.sync_engine, "before_cursor_execute", capture)
+        assert response.status_code == 304
+        assert statements and not any("members.email" in s for s in statements)
+        await async_client.delete(f"/members/{member_id}")
+        response = await async_client.get("/members", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+
+        # A change that commits with an older updated_at still changes the tag
+        etag = response.headers["ETag"]
+        await db_session.execute(
+            update(MemberDB).where(MemberDB.id == response.json()[0]["id"]).values(
+                followers=7, updated_at=datetime(2000, 1, 1, tzinfo=timezone.utc)
+            )
+        )
+        await db_session.commit()
+        response = await async_client.get("/members", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()[0]["followers"] == 7
+
+@pytest.mark.asyncio
+async def test_create_member_duplicate_after_soft_delete(async_client):
+    member = {
+        "first_name": "Test",
+        "last_name": "User",
+        "login": "testuser",
+        "email": "test@example.com"
+    }
+    response = await async_client.post("/members", json=member)
+    assert response.status_code == 200
+    member_id = response.json()["id"]
+
+    # The partial unique indexes only cover live members
+    await async_client.delete(f"/members/{member_id}")
+    response = await async_client.post("/members", json=member)
+    assert response.status_code == 200
+    assert response.json()["id"] != member_id
+
+@pytest.mark.asyncio
+async def test_upsert_member_by_login(async_client):
+    response = await async_client.put("/members/by-login/upserted", json={
+        "first_name": "Up",
+        "last_name": "Serted",
+        "email": "upserted@example.com",
+        "followers": 1
+    })
+    assert response.status_code == 200
+    created = response.json()
+    assert created["login"] == "upserted"
+    assert created["followers"] == 1
+
+    response = await async_client.put("/members/by-login/upserted", json={
+        "first_name": "Up",
+        "last_name": "Dated",
+        "email": "updated@example.com",
+        "followers": 9,
+        "title": "Lead"
+    })
+    assert response.status_code == 200
+    updated = response.json()
+    assert updated["id"] == created["id"]
+    assert updated["last_name"] == "Dated"
+    assert updated["email"] == "updated@example.com"
+    assert updated["followers"] == 9
+    assert updated["title"] == "Lead"
+    assert updated["created_at"] == created["created_at"]
+
+    members = (await async_client.get("/members")).json()
+    assert [m["last_name"] for m in members] == ["Dated"]
+
+    # The email belongs to another live member
+    await async_client.post("/members", json={
+        "first_name": "Other",
+        "last_name": "User",
+        "login": "other",
+        "email": "other@example.com"
+    })
+    response = await async_client.put("/members/by-login/upserted", json={
+        "first_name": "Up",
+        "last_name": "Dated",
+        "email": "other@example.com"
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already exists"
+
+@pytest.mark.asyncio
+async def test_soft_delete_members_in_batches(async_client):
+    ids = []
+    for i in range(7):
+        response = await async_client.post("/members", json={
+            "first_name": "Batch",
+            "last_name": f"User{i}",
+            "login": f"batch{i}",
+            "email": f"batch{i}@example.com"
+        })
+        ids.append(response.json()["id"])
+    await async_client.delete(f"/members/{ids[3]}")
+
+    with patch("app.jobs.MEMBER_DELETE_BATCH_SIZE", 3):
+        response = await async_client.delete("/members")
+    assert response.status_code == 202
+    started = response.json()
+    assert started["first_id"] == ids[0]
+    assert started["last_id"] == ids[-1]
+
+    job = await wait_for_job(async_client, started["id"])
+    assert job["status"] == "completed"
+    assert job["batches_done"] == 3
+    assert job["rows_updated"] == 6
+    assert job["current_id"] == ids[-1]
+    assert (await async_client.get("/members")).json() == []
+
+@pytest.mark.asyncio
+async def test_soft_delete_members_while_job_running(async_client):
+    async def create(i):
+        response = await async_client.post("/members", json={
+            "first_name": "Late",
+            "last_name": f"User{i}",
+            "login": f"late{i}",
+            "email": f"late{i}@example.com"
+        })
+        return response.json()["id"]
+
+    ids = [await create(i) for i in range(4)]
+    with patch("app.jobs.MEMBER_DELETE_BATCH_SIZE", 1), patch("app.jobs.MEMBER_DELETE_BATCH_PAUSE", 0.05):
+        started = (await async_client.delete("/members")).json()
+        assert started["last_id"] == ids[-1]
+
+        # A second request while the first job runs extends it to the members created since
+        ids.append(await create(4))
+        response = await async_client.delete("/members")
+        assert response.status_code == 202
+        assert response.json()["id"] == started["id"]
+        assert response.json()["last_id"] == ids[-1]
+        assert response.json()["requests"] == 2
+
+        job = await wait_for_job(async_client, started["id"])
+    assert job["status"] == "completed"
+    assert job["rows_updated"] == 5
+    assert job["current_id"] == ids[-1]
+    assert (await async_client.get("/members")).json() == []
+
+@pytest.mark.asyncio
+async def test_get_member_job_not_found(async_client):
+    response = await async_client.get("/members/jobs/unknown")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Job not found"
+
+@pytest.mark.asyncio
+async def test_archive_deleted_members(async_client, db_session):
+    ids = []
+    for i in range(4):
+        response = await async_client.post("/members", json={
+            "first_name": "Archive",
+            "last_name": f"User{i}",
+            "login": f"archive{i}",
+            "email": f"archive{i}@example.com"
+        })
+        ids.append(response.json()["id"])
+    for member_id in ids[:3]:
+        await async_client.delete(f"/members/{member_id}")
+
+    # Two of the deleted members are past the retention period
+    await db_session.execute(
+        update(MemberDB)
+        .where(MemberDB.id.in_(ids[:2]))
+        .values(updated_at=datetime.now(timezone.utc) - timedelta(days=40))
+    )
+    await db_session.commit()
+
+    response = await async_client.post("/admin/archive", params={"retention_days": 30, "batch_size": 1})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["rows_moved"] == 2
+    assert report["batches"] == 3
+
+    remaining = (await db_session.execute(select(MemberDB.id).order_by(MemberDB.id))).scalars().all()
+    assert remaining == ids[2:]
+    archived = (await db_session.execute(
+        select(MemberArchiveDB.id, MemberArchiveDB.login).order_by(MemberArchiveDB.id)
+    )).all()
+    assert archived == [(ids[0], "archive0"), (ids[1], "archive1")]
+
+    response = await async_client.post("/admin/archive", params={"retention_days": 30})
+    assert response.json()["rows_moved"] == 0
+
+@pytest.mark.asyncio
+async def test_update_member_counters(async_client):
+    response = await async_client.post("/members", json={
+        "first_name": "Counter",
+        "last_name": "User",
+        "login": "counter",
+        "email": "counter@example.com",
+        "followers": 5,
+        "following": 2
+    })
+    member = response.json()
+
+    response = await async_client.post(f"/members/{member['id']}/counters", json={"followers": 3, "following": -1})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["followers"] == 8
+    assert data["following"] == 1
+    assert data["updated_at"] >= member["updated_at"]
+
+    # Counters never go below zero
+    response = await async_client.post(f"/members/{member['id']}/counters", json={"following": -10})
+    assert response.json()["following"] == 0
+    assert (await async_client.get("/members")).json()[0]["following"] == 0
+
+    response = await async_client.post("/members/99999/counters", json={"followers": 1})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Member not found"
+
+    # Deltas are int4 like the columns, and sums saturate instead of overflowing
+    response = await async_client.post(f"/members/{member['id']}/counters", json={"followers": 2**31})
+    assert response.status_code == 422
+    for _ in range(2):
+        response = await async_client.post(f"/members/{member['id']}/counters", json={"followers": 2**31 - 1})
+        assert response.status_code == 200
+    assert response.json()["followers"] == 2**31 - 1
+
+    with patch("app.routes.counter_values", return_value={"followers": func.cast("x", Integer)}):
+        response = await async_client.post(f"/members/{member['id']}/counters", json={"followers": 1})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_update_member_counters_coalesced(async_client):
+    ids = []
+    for i in range(2):
+        response = await async_client.post("/members", json={
+            "first_name": "Burst",
+            "last_name": f"User{i}",
+            "login": f"burst{i}",
+            "email": f"burst{i}@example.com"
+        })
+        ids.append(response.json()["id"])
+
+    before = (await async_client.get("/admin/counters")).json()
+    with patch.object(counter_coalescer, "window", 60):
+        for _ in range(10):
+            for member_id in ids:
+                response = await async_client.post(
+                    f"/members/{member_id}/counters", params={"coalesce": "true"}, json={"followers": 1}
+                )
+                assert response.status_code == 202
+        await async_client.post(f"/members/{ids[0]}/counters", params={"coalesce": "true"}, json={"following": 4})
+        assert (await async_client.get("/admin/counters")).json()["pending_members"] == 2
+        await counter_coalescer.close()
+
+    stats = (await async_client.get("/admin/counters")).json()
+    assert stats["increments"] - before["increments"] == 21
+    assert stats["flushes"] - before["flushes"] == 1
+    assert stats["rows_written"] - before["rows_written"] == 2
+    members = {m["id"]: m for m in (await async_client.get("/members")).json()}
+    assert members[ids[0]]["followers"] == 10
+    assert members[ids[0]]["following"] == 4
+    assert members[ids[1]]["followers"] == 10
+
+@pytest.mark.asyncio
+async def test_update_member_counters_coalesced_flush_failure(async_client):
+    response = await async_client.post("/members", json={
+        "first_name": "Retry",
+        "last_name": "User",
+        "login": "retry",
+        "email": "retry@example.com"
+    })
+    member_id = response.json()["id"]
+
+    with patch.object(counter_coalescer, "window", 60):
+        for _ in range(3):
+            await async_client.post(f"/members/{member_id}/counters", params={"coalesce": "true"}, json={"followers": 1})
+        bind = counter_coalescer._bind
+        failing = MagicMock()
+        failing.begin.side_effect = SQLAlchemyError("connection refused")
+        counter_coalescer._bind = failing
+        before = (await async_client.get("/admin/counters")).json()
+
+        # The failure is logged, not raised out of shutdown, and nothing acknowledged is dropped
+        await counter_coalescer.close()
+        stats = (await async_client.get("/admin/counters")).json()
+        assert stats["failed_flushes"] - before["failed_flushes"] == 1
+        assert stats["pending_members"] == 1
+
+        await async_client.post(f"/members/{member_id}/counters", params={"coalesce": "true"}, json={"followers": 1})
+        assert counter_coalescer._bind is bind
+        await counter_coalescer.close()
+
+    assert (await async_client.get("/admin/counters")).json()["pending_members"] == 0
+    assert (await async_client.get("/members")).json()[0]["followers"] == 4
+
+@pytest.mark.asyncio
+async def test_update_member_counters_coalesced_refused_delta(async_client):
+    ids = []
+    for i in range(3):
+        response = await async_client.post("/members", json={
+            "first_name": "Refused",
+            "last_name": f"User{i}",
+            "login": f"refused{i}",
+            "email": f"refused{i}@example.com"
+        })
+        ids.append(response.json()["id"])
+
+    with patch.object(counter_coalescer, "window", 60):
+        for member_id in ids:
+            await async_client.post(f"/members/{member_id}/counters", params={"coalesce": "true"}, json={"followers": 2})
+        # Sums are held to int4 while buffered
+        for _ in range(3):
+            await async_client.post(f"/members/{ids[0]}/counters", params={"coalesce": "true"}, json={"followers": 2**31 - 1})
+        assert counter_coalescer._pending[ids[0]] == [2**31 - 1, 0]
+
+        # A delta the database refuses is dropped on its own; the rest are written
+        counter_coalescer._pending[ids[1]][0] = 2**31
+        before = (await async_client.get("/admin/counters")).json()
+        await counter_coalescer.close()
+
+    stats = (await async_client.get("/admin/counters")).json()
+    assert stats["dropped"] - before["dropped"] == 1
+    assert stats["failed_flushes"] == before["failed_flushes"]
+    assert stats["pending_members"] == 0
+    members = {m["id"]: m["followers"] for m in (await async_client.get("/members")).json()}
+    assert members == {ids[0]: 2**31 - 1, ids[1]: 0, ids[2]: 2}
+
+@pytest.mark.asyncio
+async def test_top_members_and_rank(async_client, db_session):
+    ids = {}
+    for login, followers in [("low", 1), ("high", 50), ("mid", 10), ("tie", 10)]:
+        response = await async_client.post("/members", json={
+            "first_name": "Rank",
+            "last_name": login,
+            "login": login,
+            "email": f"{login}@example.com",
+            "followers": followers
+        })
+        ids[login] = response.json()["id"]
+    await leaderboard.refresh(db_session.bind)
+
+    response = await async_client.get("/members/top", params={"n": 3})
+    assert response.status_code == 200
+    top = response.json()
+    assert [(m["login"], m["rank"]) for m in top] == [("high", 1), ("tie", 2), ("mid", 3)]
+    assert top[0]["email"] == "high@example.com"
+
+    response = await async_client.get(f"/members/{ids['mid']}/rank")
+    assert response.status_code == 200
+    rank = response.json()
+    assert rank["rank"] == 3
+    assert rank["followers"] == 10
+    assert rank["as_of"] is not None
+
+    # Not in the precomputed ranking yet: ranked live
+    response = await async_client.post("/members", json={
+        "first_name": "Rank",
+        "last_name": "new",
+        "login": "new",
+        "email": "new@example.com",
+        "followers": 20
+    })
+    response = await async_client.get(f"/members/{response.json()['id']}/rank")
+    assert response.json()["rank"] == 2
+    assert response.json()["as_of"] is None
+
+    # Deleted members drop out of both endpoints
+    await async_client.delete(f"/members/{ids['high']}")
+    assert leaderboard.dirty
+    response = await async_client.get(f"/members/{ids['high']}/rank")
+    assert response.status_code == 404
+    response = await async_client.get("/members/top", params={"n": 1})
+    assert [m["login"] for m in response.json()] == ["tie"]
+
+    await leaderboard.refresh(db_session.bind)
+    response = await async_client.get("/members/top")
+    assert [m["login"] for m in response.json()] == ["new", "tie", "mid", "low"]
+    assert [m["rank"] for m in response.json()] == [1, 2, 3, 4]
+    response = await async_client.get("/members/top", params={"n": 1, "fields": "login"})
+    assert response.json() == [{"login": "new", "rank": 1}]
+
+@pytest.mark.asyncio
+async def test_search_members(async_client):
+    for first, last, login, followers in [
+        ("Alexander", "Hamilton", "ahamilton", 5),
+        ("Alexandra", "Stone", "astone", 9),
+        ("Bob", "Alexson", "bob_a", 1),
+        ("Carol", "Smith", "c%rol", 3),
+    ]:
+        await async_client.post("/members", json={
+            "first_name": first,
+            "last_name": last,
+            "login": login,
+            "email": f"{login.replace('%', '')}@example.com",
+            "followers": followers
+        })
+
+    # Prefix on first and last names, case-insensitive, ordered by followers
+    response = await async_client.get("/members/search", params={"q": "ALEX"})
+    assert response.status_code == 200
+    assert [m["login"] for m in response.json()] == ["astone", "ahamilton", "bob_a"]
+
+    response = await async_client.get("/members/search", params={"q": "alex", "limit": 1})
+    assert [m["login"] for m in response.json()] == ["astone"]
+
+    # Prefix on email and login, with LIKE wildcards taken literally; prefix
+    # hits rank ahead of weaker fuzzy matches
+    response = await async_client.get("/members/search", params={"q": "crol@"})
+    assert response.json()[0]["login"] == "c%rol"
+    response = await async_client.get("/members/search", params={"q": "c%"})
+    assert response.json()[0]["login"] == "c%rol"
+    response = await async_client.get("/members/search", params={"q": "bob_"})
+    assert response.json()[0]["login"] == "bob_a"
+
+    # The shared email domain is not searched
+    response = await async_client.get("/members/search", params={"q": "example"})
+    assert response.json() == []
+
+    # Typo-tolerant once the prefix matches run out, without unrelated members
+    response = await async_client.get("/members/search", params={"q": "alexandrr"})
+    assert [m["login"] for m in response.json()] == ["astone", "ahamilton"]
+    response = await async_client.get("/members/search", params={"q": "hamilten"})
+    assert [m["login"] for m in response.json()] == ["ahamilton"]
+
+    # Deleted members are not found
+    member_id = response.json()[0]["id"]
+    await async_client.delete(f"/members/{member_id}")
+    response = await async_client.get("/members/search", params={"q": "hamilton"})
+    assert response.json() == []
+
+    response = await async_client.get("/members/search", params={"q": "  "})
+    assert response.status_code == 400
+    response = await async_client.get("/members/search")
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_get_members_filters(async_client):
+    for login, title, followers, following in [
+        ("eng1", "Engineer", 50, 3),
+        ("eng2", "Engineer", 5, 30),
+        ("mgr1", "Manager", 20, 10),
+        ("none", None, 100, 0),
+    ]:
+        await async_client.post("/members", json={
+            "first_name": "Filter",
+            "last_name": login,
+            "login": login,
+            "email": f"{login}@example.com",
+            "title": title,
+            "followers": followers,
+            "following": following
+        })
+
+    async def logins(**params):
+        response = await async_client.get("/members", params=params)
+        assert response.status_code == 200
+        return [m["login"] for m in response.json()]
+
+    assert await logins(title="Engineer") == ["eng1", "eng2"]
+    assert await logins(min_followers=20) == ["none", "eng1", "mgr1"]
+    assert await logins(min_followers=10, max_followers=60) == ["eng1", "mgr1"]
+    assert await logins(min_following=10) == ["mgr1", "eng2"]
+    assert await logins(title="Engineer", min_following=10) == ["eng2"]
+    assert await logins(created_after="2000-01-01T00:00:00Z") == ["none", "eng1", "mgr1", "eng2"]
+    assert await logins(created_after=datetime.now(timezone.utc).isoformat()) == []
+
+    # Filters combine with keyset pagination
+    response = await async_client.get("/members", params={"min_followers": 10, "limit": 1})
+    assert [m["login"] for m in response.json()] == ["none"]
+    response = await async_client.get("/members", params={
+        "min_followers": 10, "limit": 5, "cursor": response.headers["X-Next-Cursor"]
+    })
+    assert [m["login"] for m in response.json()] == ["eng1", "mgr1"]
+
+    response = await async_client.get("/members", params={"min_followers": -1})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filters, index", [
+    (MemberFilters(title="Recruiter"), "ix_members_title_followers_live"),
+    (MemberFilters(title="Engineer", min_followers=250), "ix_members_title_followers_live"),
+    (MemberFilters(min_followers=290), "ix_members_followers_id_live"),
+    (MemberFilters(min_following=498), "ix_members_following_live"),
+    (MemberFilters(created_after=datetime.now(timezone.utc) - timedelta(minutes=30)), "ix_members_created_at_live"),
+])
+async def test_get_members_filters_use_index(db_session, filters, index):
+    # Enough rows, and selective enough predicates, for the planner to prefer
+    # each filter's index over walking the followers index and filtering
+    connection = await db_session.connection()
+    await connection.exec_driver_sql("""
+        INSERT INTO members (first_name, last_name, login, email, title, followers, following, deleted, created_at)
+        SELECT 'Plan', i::text, 'plan' || i, 'plan' || i || '@example.com',
+               CASE WHEN i % 100 = 0 THEN 'Recruiter' WHEN i % 4 = 0 THEN 'Manager' ELSE 'Engineer' END,
+               i % 300, i % 500, i % 10 = 0, now() - i * interval '1 minute'
+        FROM generate_series(1, 20000) AS i
+    """)
+    await connection.exec_driver_sql("ANALYZE members")
+
+    query = member_list_query(filters).limit(101)
+    sql = str(query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    plan = "\n".join(row[0] for row in await connection.exec_driver_sql(f"EXPLAIN {sql}"))
+    await db_session.rollback()
+
+    assert "Seq Scan" not in plan, plan
+    assert index in plan, plan
+
+@pytest.mark.asyncio
+async def test_get_members_sparse_fields(async_client):
+    for i, followers in enumerate([30, 20, 10]):
+        await async_client.post("/members", json={
+            "first_name": "Sparse",
+            "last_name": str(i),
+            "login": f"sparse{i}",
+            "email": f"sparse{i}@example.com",
+            "avatar_url": f"https://avatars.example.com/{i}",
+            "followers": followers
+        })
+
+    response = await async_client.get("/members", params={"fields": "login,id"})
+    assert response.status_code == 200
+    members = response.json()
+    assert [list(m) for m in members] == [["id", "login"]] * 3
+    assert [m["login"] for m in members] == ["sparse0", "sparse1", "sparse2"]
+
+    # The cursor still works when followers is not part of the output
+    response = await async_client.get("/members", params={"fields": "login", "limit": 2})
+    assert response.json() == [{"login": "sparse0"}, {"login": "sparse1"}]
+    response = await async_client.get("/members", params={
+        "fields": "login", "limit": 2, "cursor": response.headers["X-Next-Cursor"]
+    })
+    assert response.json() == [{"login": "sparse2"}]
+
+    # Different projections are cached and fingerprinted separately
+    full = await async_client.get("/members")
+    sparse = await async_client.get("/members", params={"fields": "id"})
+    assert len(full.json()[0]) == 11
+    assert full.headers["ETag"] != sparse.headers["ETag"]
+
+    response = await async_client.get("/members", params={"fields": "id,followers", "stream": True})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"id": members[0]["id"], "followers": 30}
+
+    response = await async_client.get("/members/search", params={"q": "sparse1", "fields": "login"})
+    assert response.json()[0] == {"login": "sparse1"}
+
+    response = await async_client.get("/members", params={"fields": "login,password"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: password"
+    response = await async_client.get("/members", params={"fields": ","})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_member_by_id(async_client):
+    response = await async_client.post("/members", json={
+        "first_name": "Single",
+        "last_name": "User",
+        "login": "single",
+        "email": "single@example.com",
+        "followers": 7
+    })
+    created = response.json()
+
+    response = await async_client.get(f"/members/{created['id']}")
+    assert response.status_code == 200
+    assert response.json() == created
+    etag = response.headers["ETag"]
+
+    response = await async_client.get(f"/members/{created['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    response = await async_client.get(f"/members/{created['id']}", params={"fields": "login,followers"})
+    assert response.json() == {"login": "single", "followers": 7}
+    assert response.headers["ETag"] != etag
+
+    # A counter update invalidates the cached member and changes its ETag
+    await async_client.post(f"/members/{created['id']}/counters", json={"followers": 1})
+    response = await async_client.get(f"/members/{created['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["followers"] == 8
+
+    await async_client.delete(f"/members/{created['id']}")
+    response = await async_client.get(f"/members/{created['id']}")
+    assert response.status_code == 404
+    response = await async_client.get("/members/999999")
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_lookup_members(async_client):
+    ids = []
+    for i in range(3):
+        response = await async_client.post("/members", json={
+            "first_name": "Lookup",
+            "last_name": str(i),
+            "login": f"lookup{i}",
+            "email": f"lookup{i}@example.com"
+        })
+        ids.append(response.json()["id"])
+    await async_client.delete(f"/members/{ids[1]}")
+
+    response = await async_client.post(
+        "/members/lookup", params={"fields": "id,login"}, json={"ids": [ids[2], 999999, ids[0], ids[1], ids[2]]}
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "members": [{"id": ids[2], "login": "lookup2"}, {"id": ids[0], "login": "lookup0"}],
+        "not_found": [999999, ids[1]],
+    }
+
+    response = await async_client.post("/members/lookup", json={"ids": list(range(1001))})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_member_lookups_are_coalesced(async_client):
+    ids = []
+    for i in range(5):
+        response = await async_client.post("/members", json={
+            "first_name": "Coalesce",
+            "last_name": str(i),
+            "login": f"coalesce{i}",
+            "email": f"coalesce{i}@example.com"
+        })
+        ids.append(response.json()["id"])
+
+    responses = await asyncio.gather(*(async_client.get(f"/members/{member_id}") for member_id in ids))
+    assert [r.json()["login"] for r in responses] == [f"coalesce{i}" for i in range(5)]
+    stats = (await async_client.get("/admin/loader")).json()
+    assert stats["ids_fetched"] == 5
+    assert stats["batches"] < 5
+
+    # Served from the per-id cache until a write touches the member
+    await async_client.get(f"/members/{ids[0]}")
+    assert (await async_client.get("/admin/loader")).json()["batches"] == stats["batches"]
+    await async_client.delete(f"/members/{ids[0]}")
+    assert (await async_client.get(f"/members/{ids[0]}")).status_code == 404
+    assert (await async_client.get("/admin/loader")).json()["batches"] == stats["batches"] + 1
+
+@pytest.mark.asyncio
+async def test_soft_delete_members_by_id(async_client):
+    ids = []
+    for i in range(4):
+        response = await async_client.post("/members", json={
+            "first_name": "Offboard",
+            "last_name": str(i),
+            "login": f"offboard{i}",
+            "email": f"offboard{i}@example.com"
+        })
+        ids.append(response.json()["id"])
+    await async_client.delete(f"/members/{ids[3]}")
+
+    response = await async_client.post("/members/delete", json={"ids": [ids[0], ids[2], ids[3], 999999, ids[0]]})
+    assert response.status_code == 200
+    assert response.json() == {"deleted": [ids[0], ids[2]], "not_found": [ids[3], 999999]}
+
+    response = await async_client.get("/members")
+    assert [m["login"] for m in response.json()] == ["offboard1"]
+
+    # Already deleted ids are reported as not found on a retry
+    response = await async_client.post("/members/delete", json={"ids": [ids[0]]})
+    assert response.json() == {"deleted": [], "not_found": [ids[0]]}
+
+    response = await async_client.post("/members/delete", json={"ids": list(range(10_001))})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_member_changes(async_client, db_session):
+    async def changes(since=None, limit=100):
+        params = {"limit": limit}
+        if since:
+            params["since"] = since
+        response = await async_client.get("/members/changes", params=params)
+        assert response.status_code == 200
+        return response.json(), response.headers.get("X-Next-Cursor")
+
+    ids = []
+    for i in range(3):
+        response = await async_client.post("/members", json={
+            "first_name": "Change",
+            "last_name": str(i),
+            "login": f"change{i}",
+            "email": f"change{i}@example.com"
+        })
+        ids.append(response.json()["id"])
+
+    with patch("app.routes.MEMBER_CHANGES_LAG_SECONDS", 0):
+        first, cursor = await changes(limit=2)
+        assert [c["id"] for c in first] == ids[:2]
+        assert first[0]["member"]["login"] == "change0"
+        assert first[0]["deleted"] is False
+        rest, cursor = await changes(cursor)
+        assert [c["id"] for c in rest] == ids[2:]
+
+        # Nothing new: the cursor is handed back unchanged
+        empty, same = await changes(cursor)
+        assert empty == [] and same == cursor
+
+        await async_client.post(f"/members/{ids[0]}/counters", json={"followers": 3})
+        await async_client.delete(f"/members/{ids[1]}")
+        delta, cursor = await changes(cursor)
+        assert [(c["id"], c["deleted"]) for c in delta] == [(ids[0], False), (ids[1], True)]
+        assert delta[0]["member"]["followers"] == 3
+        assert delta[1]["member"] is None
+
+        # The delete-all job bumps updated_at, so its deletes show up too
+        response = await async_client.delete("/members")
+        await wait_for_job(async_client, response.json()["id"])
+        delta, cursor = await changes(cursor)
+        assert [(c["id"], c["deleted"]) for c in delta] == [(ids[0], True), (ids[2], True)]
+
+    # Rows of a write transaction open for longer than the lag are not skipped:
+    # the feed stops at its start until it commits
+    response = await async_client.post("/members", json={
+        "first_name": "Change",
+        "last_name": "3",
+        "login": "change3",
+        "email": "change3@example.com"
+    })
+    later_id = response.json()["id"]
+    with patch("app.routes.MEMBER_CHANGES_LAG_SECONDS", 0.05):
+        await asyncio.sleep(0.1)
+        _, cursor = await changes(cursor)
+        # The app shares db_session across requests here; end its read
+        # transaction so the next write is stamped after the one below starts
+        await db_session.commit()
+        async with db_session.bind.connect() as conn:
+            transaction = await conn.begin()
+            await conn.execute(
+                update(MemberDB).where(MemberDB.id == ids[2]).values(deleted=False, updated_at=func.now())
+            )
+            await asyncio.sleep(0.1)
+            await async_client.post(f"/members/{later_id}/counters", json={"followers": 1})
+            await asyncio.sleep(0.1)
+            held, same = await changes(cursor)
+            assert held == [] and same == cursor
+            await transaction.commit()
+        # pg_stat_activity is read once per transaction, and each request gets
+        # its own session in the app
+        await db_session.commit()
+        delta, cursor = await changes(cursor)
+        assert [(c["id"], c["deleted"]) for c in delta] == [(ids[2], False), (later_id, False)]
+
+    # Changes younger than the lag are held back
+    with patch("app.routes.MEMBER_CHANGES_LAG_SECONDS", 3600):
+        held, _ = await changes()
+        assert held == []
+
+    response = await async_client.get("/members/changes", params={"since": "not-a-cursor"})
+    assert response.status_code == 400
@@ -16,6 +16,12 @@ def test_member_create_validation():
     )
     assert m.login == "alice01"
 
+    # Only what the integer and text columns can store
+    for extra in ({"followers": 2**31}, {"following": -2**31 - 1}, {"title": "a\x00b"}):
+        with pytest.raises(ValidationError):
+            MemberCreate(first_name="A", last_name="B", login="ab", email="ab@example.com", **extra)
+    assert MemberCreate(first_name="A", last_name="B", login="ab", email="ab@example.com", followers=2**31 - 1)
+
 def test_member_schema():
     now = datetime.now(timezone.utc)
     member = Member(
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import select, text
+from app.slow_queries import redact, slow_query_log
+
+def test_redact_keeps_only_the_shape():
+    assert redact(("secret@example.com", 5, [1, 2, 3], None)) == ["<str>", "<int>", "<list[3]>", "<NoneType>"]
+    assert redact({"email": "secret@example.com"}) == ["<str>"]
+    assert redact(None) == []
+
+@pytest.fixture
+def slow_log(db_session):
+    threshold, sample = slow_query_log.threshold_ms, slow_query_log.explain_sample
+    slow_query_log.threshold_ms, slow_query_log.explain_sample = 0, 1.0
+    slow_query_log.clear()
+    slow_query_log.install(db_session.bind)
+    yield slow_query_log
+    slow_query_log.uninstall()
+    slow_query_log.clear()
+    slow_query_log.threshold_ms, slow_query_log.explain_sample = threshold, sample
+
+@pytest.mark.asyncio
+async def test_slow_query_log(async_client, slow_log):
+    await async_client.post("/members", json={
+        "first_name": "Slow",
+        "last_name": "Query",
+        "login": "slow",
+        "email": "slow@example.com"
+    })
+    response = await async_client.get("/members", params={"min_followers": 0})
+    assert response.status_code == 200
+    assert [m["login"] for m in response.json()] == ["slow"]
+
+    snapshot = (await async_client.get("/admin/slow-queries")).json()
+    assert snapshot["enabled"]
+    queries = snapshot["queries"]
+
+    insert = next(q for q in queries if q["statement"].lstrip().startswith("INSERT"))
+    assert insert["route"] == "create_member"
+    assert "slow@example.com" not in str(insert["parameters"])
+    assert insert["plan"] is None  # writes are never re-run
+
+    listing = next(q for q in queries if q["route"] == "get_members" and "ORDER BY" in q["statement"])
+    assert any("Index Scan" in line or "Seq Scan" in line for line in listing["plan"])
+    assert any("Execution Time" in line for line in listing["plan"])
+    assert listing["duration_ms"] >= 0
+
+@pytest.mark.asyncio
+async def test_slow_query_threshold(db_session, slow_log):
+    slow_log.threshold_ms = 10_000
+    await db_session.execute(select(1))
+    assert slow_log.recorded == 0
+
+    slow_log.threshold_ms, slow_log.explain_sample = 0, 0
+    await db_session.execute(text("SELECT pg_sleep(0.01)"))
+    assert slow_log.recorded == 1
+    entry = slow_log.entries[-1]
+    assert entry["duration_ms"] >= 10
+    assert entry["route"] is None
+    assert entry["plan"] is None
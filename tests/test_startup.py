@@ -0,0 +1,119 @@
+from unittest.mock import AsyncMock, patch
+import pytest
+from sqlalchemy import literal_column, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from shared.db.base import Base
+from app.main import HOT_QUERIES
+from app.startup import backoff_delay, prewarm_pool, schema_present, start_database, startup_state, wait_for_database
+from conftest import TEST_DATABASE_URL
+
+class FlakyEngine:
+    """Refuses the first `failures` connections."""
+
+    def __init__(self, engine, failures):
+        self.engine = engine
+        self.failures = failures
+
+    def connect(self):
+        if self.failures:
+            self.failures -= 1
+            raise OperationalError("connect", {}, ConnectionRefusedError())
+        return self.engine.connect()
+
+def test_backoff_delay_is_jittered_and_capped():
+    with patch("app.startup.random.uniform", side_effect=lambda low, high: high):
+        assert [backoff_delay(a, base=0.1, cap=1) for a in range(6)] == [0.1, 0.2, 0.4, 0.8, 1, 1]
+    assert all(0 <= backoff_delay(3, base=0.1, cap=1) <= 0.8 for _ in range(100))
+
+@pytest.mark.asyncio
+async def test_wait_for_database_retries(db_session):
+    with patch("app.startup.asyncio.sleep", new=AsyncMock()) as sleep:
+        assert await wait_for_database(FlakyEngine(db_session.bind, 2), attempts=5) == 3
+    assert sleep.await_count == 2
+
+    with patch("app.startup.asyncio.sleep", new=AsyncMock()):
+        with pytest.raises(RuntimeError):
+            await wait_for_database(FlakyEngine(db_session.bind, 5), attempts=3)
+
+@pytest.mark.asyncio
+async def test_start_database_skips_existing_schema(db_session):
+    async with db_session.bind.begin() as conn:
+        assert await schema_present(conn, Base.metadata)
+
+    engine = create_async_engine(TEST_DATABASE_URL, pool_size=3)
+    try:
+        await start_database(engine, Base.metadata, 3, HOT_QUERIES)
+        assert startup_state.ready
+        assert not startup_state.schema_created
+        assert startup_state.prewarmed == 3
+        assert engine.pool.checkedin() == 3
+    finally:
+        startup_state.ready = False
+        await engine.dispose()
+
+    async with db_session.bind.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        assert not await schema_present(conn, Base.metadata)
+    engine = create_async_engine(TEST_DATABASE_URL)
+    try:
+        await start_database(engine, Base.metadata, 0)
+        assert startup_state.schema_created
+        async with engine.connect() as conn:
+            assert await schema_present(conn, Base.metadata)
+    finally:
+        startup_state.ready = False
+        startup_state.schema_created = False
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_start_database_creates_missing_indexes(db_session):
+    # An existing deployment predating an index, or the leaderboard view's indexes
+    async with db_session.bind.begin() as conn:
+        await conn.exec_driver_sql("DROP INDEX ix_members_search_gist")
+        await conn.exec_driver_sql("DROP INDEX ix_member_rankings_rank")
+        assert not await schema_present(conn, Base.metadata)
+
+    engine = create_async_engine(TEST_DATABASE_URL)
+    try:
+        await start_database(engine, Base.metadata, 0)
+        assert startup_state.schema_created
+        async with engine.connect() as conn:
+            assert await schema_present(conn, Base.metadata)
+    finally:
+        startup_state.ready = False
+        startup_state.schema_created = False
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_prewarm_pool_survives_failures(db_session):
+    assert await prewarm_pool(FlakyEngine(db_session.bind, 1), 2) == 1
+    assert await prewarm_pool(db_session.bind, 0) == 0
+
+    # A failing statement hands its connection back instead of leaking it
+    engine = create_async_engine(TEST_DATABASE_URL, pool_size=2)
+    try:
+        assert await prewarm_pool(engine, 2, [select(literal_column("1 / 0"))]) == 0
+        assert engine.pool.checkedout() == 0
+    finally:
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_health_endpoints(async_client):
+    response = await async_client.get("/health/live")
+    assert response.json() == {"status": "alive"}
+
+    # Not ready until the lifespan has finished starting up
+    response = await async_client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+    startup_state.ready = True
+    try:
+        response = await async_client.get("/health/ready")
+    finally:
+        startup_state.ready = False
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert "class" in body["pool"]